@@ -1,11 +1,13 @@
 """Docs config."""
 
 from datetime import date
-from hashlib import sha256
+from json import dumps
 from pathlib import Path
 
-from dev.docs import DOCS, PYPROJECT, chdir_docs
-from dev.docs.intersphinx import get_ispx, get_rtd, get_url
+from dev.docs import DOCS, NOTEBOOK_CACHE, PYPROJECT, READ_REPORT, chdir_docs
+from dev.docs.assets import copy_fingerprinted, fingerprint, get_manifest
+from dev.docs.docstrings import get_docstrings, preconvert
+from dev.docs.intersphinx import cache_inventories, get_ispx, get_rtd, get_url
 from dev.docs.types import IspxMappingValue
 from ruamel.yaml import YAML
 from sphinx.application import Sphinx
@@ -38,13 +40,13 @@ PACKAGE = ANS["project_name"]
 VERSION = ANS["project_version"]
 """Package version."""
 # ! Intersphinx and related
-ISPX_MAPPING: dict[str, IspxMappingValue] = {
+ISPX_MAPPING: dict[str, IspxMappingValue] = cache_inventories({
     **{pkg: get_rtd(pkg) for pkg in ["myst_parser", "numpydoc"]},
     "pytest": get_url("docs.pytest.org/en"),
     "python": get_ispx("docs.python.org/3"),
     "pandas": get_ispx("pandas.pydata.org/docs"),
-}
-"""Intersphinx mapping."""
+})
+"""Intersphinx mapping, with locally-cached inventories."""
 TIPPY_RTD_URLS = [
     ispx.url
     for pkg, ispx in ISPX_MAPPING.items()
@@ -57,11 +59,41 @@ TIPPY_RTD_URLS = [
 
 def setup(app: Sphinx):
     """Add functions to Sphinx setup."""
-    app.connect("html-page-context", add_version_to_css)
+    app.setup_extension("dev.docs.profiler")
+    app.add_config_value("fingerprint_filenames", False, "html")
+    app.connect("builder-inited", preconvert_docstrings)
+    app.connect("builder-inited", hash_assets)
+    app.connect("env-before-read-docs", report_read_docs)
+    app.connect("html-page-context", fingerprint_assets)
+    app.connect("build-finished", copy_fingerprinted_assets)
+
+
+def preconvert_docstrings(app: Sphinx):
+    """Convert docstrings of `autodoc2_packages` in a process pool, ahead of parsing."""
+    paths = [
+        Path(package if isinstance(package, str) else package["path"])
+        for package in app.config.autodoc2_packages
+    ]
+    preconvert(
+        get_docstrings(path for path in paths if path.exists()),
+        jobs=app.parallel or None,
+    )
+
+
+def report_read_docs(_app: Sphinx, _env, docnames: list[str]):
+    """Report documents to be read, those whose sources or dependencies changed."""
+    (report := ROOT / READ_REPORT).parent.mkdir(parents=True, exist_ok=True)
+    report.write_text(encoding="utf-8", data=dumps(sorted(docnames), indent=2))
 
 
-def add_version_to_css(app: Sphinx, _pagename, _templatename, ctx, _doctree):
-    """Add the version number to the local.css file, to bust the cache for changes.
+def hash_assets(_app: Sphinx):
+    """Hash static assets into a manifest, once per build."""
+    get_manifest.cache_clear()
+    get_manifest(ROOT / STATIC)
+
+
+def fingerprint_assets(app: Sphinx, _pagename, _templatename, ctx, _doctree):
+    """Fingerprint static assets linked from a page, to bust the cache for changes.
 
     See Also
     --------
@@ -69,9 +101,18 @@ def add_version_to_css(app: Sphinx, _pagename, _templatename, ctx, _doctree):
     """
     if app.builder.name != "html":
         return
-    css = dpath(CSS)
-    if css in ctx.get((k := "css_files"), {}):
-        ctx[k][ctx[k].index(css)] = f"{css}?hash={sha256(CSS.read_bytes()).hexdigest()}"
+    for k in ["css_files", "script_files"]:
+        if k in ctx:
+            ctx[k] = fingerprint(
+                ctx[k], get_manifest(ROOT / STATIC), app.config.fingerprint_filenames
+            )
+
+
+def copy_fingerprinted_assets(app: Sphinx, exception: Exception | None):
+    """Copy static assets to their hashed filenames, if linked by hashed filename."""
+    if exception or app.builder.name != "html" or not app.config.fingerprint_filenames:
+        return
+    copy_fingerprinted(Path(app.outdir), get_manifest(ROOT / STATIC))
 
 
 def dpaths(*paths: Path, rel: Path = DOCS) -> list[str]:
@@ -108,16 +149,17 @@ master_doc = "index"
 language = "en"
 exclude_patterns = ["_build", "Thumbs.db", ".DS_Store"]
 extensions = [
-    "autodoc2",
+    "dev.docs.analysis",
+    "dev.docs.incremental",
     "myst_nb",
     "sphinx_design",
-    "sphinx_tippy",
+    "dev.docs.tippy",
     "sphinx_togglebutton",
     "sphinx.ext.intersphinx",
     "sphinx.ext.mathjax",
     "sphinxcontrib.bibtex",
     "sphinxcontrib.mermaid",
-    "sphinxcontrib.towncrier",
+    "dev.docs.changelog",
 ]
 # ! Theme
 html_title = PACKAGE
@@ -125,6 +167,8 @@ html_title = PACKAGE
 # html_logo = "_static/favicon.ico"
 html_static_path = dpaths(STATIC)
 html_css_files = dpaths(CSS, rel=STATIC)
+# ? Link static assets by hashed filename, e.g. to serve them with immutable caching
+fingerprint_filenames = False
 html_theme = "sphinx_book_theme"
 html_context = {
     # ? MyST elements don't look great with dark mode, but allow dark for accessibility.
@@ -163,6 +207,7 @@ bibtex_reference_style = "label"
 bibtex_default_style = "unsrt"
 # ! NB
 nb_execution_mode = "cache"
+nb_execution_cache_path = (ROOT / NOTEBOOK_CACHE).as_posix()
 nb_execution_raise_on_error = True
 # ! Other
 numfig = True
@@ -183,7 +228,7 @@ autodoc2_render_plugin = "myst"
 # ? https://github.com/sphinx-extensions2/sphinx-autodoc2/issues/58
 maximum_signature_line_length = 1
 # ? Parse Numpy docstrings
-autodoc2_docstring_parser_regexes = [(".*", f"{PACKAGE}_docs.docstrings")]
+autodoc2_docstring_parser_regexes = [(".*", "dev.docs.docstrings")]
 # ! Intersphinx
 intersphinx_mapping = ISPX_MAPPING
 nitpick_ignore = []
@@ -9,6 +9,22 @@ PYPROJECT = Path("pyproject.toml")
 """Path to `pyproject.toml`."""
 CHECKS = [DOCS, PYPROJECT]
 """Checks for the root directory."""
+OFFLINE = "DEV_DOCS_OFFLINE"
+"""Environment variable which, if set, builds docs from cached remote data alone."""
+DOCS_CACHE = Path(".cache/docs")
+"""Docs build cache, restorable in CI."""
+NOTEBOOK_CACHE = DOCS_CACHE / "jupyter_cache"
+"""Notebook execution cache."""
+READ_REPORT = DOCS_CACHE / "read.json"
+"""Documents read by the last docs build."""
+INVENTORIES = DOCS_CACHE / "intersphinx"
+"""Cached intersphinx inventories."""
+TIPS = DOCS_CACHE / "tips.json"
+"""Cached sphinx-tippy tips."""
+PROFILE = DOCS_CACHE / "profile"
+"""Docs build profiles."""
+PROFILE_REPORT = PROFILE / "events.json"
+"""Timings of docs build events."""
 
 
 def chdir_docs() -> Path:
@@ -0,0 +1,84 @@
+"""Static asset fingerprints.
+
+Static assets are hashed once per build into a manifest, which then fingerprints the
+assets linked from every page, either by query string or by hashed filename.
+"""
+
+from collections.abc import Mapping
+from functools import cache
+from hashlib import sha256
+from pathlib import Path, PurePosixPath
+from shutil import copyfile
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+DIGEST_LENGTH = 16
+"""Length of digests in fingerprints."""
+
+
+@cache
+def get_manifest(static: Path) -> dict[str, str]:
+    """Get digests of static assets, keyed by their paths as linked from pages.
+
+    Parameters
+    ----------
+    static
+        Static assets directory, e.g. `docs/_static`.
+    """
+    return {
+        (PurePosixPath(static.name) / path.relative_to(static).as_posix()).as_posix(): (
+            sha256(path.read_bytes()).hexdigest()[:DIGEST_LENGTH]
+        )
+        for path in sorted(static.rglob("*"))
+        if path.is_file()
+    }
+
+
+def get_fingerprinted_name(path: str, digest: str) -> str:
+    """Get the name of an asset with its digest, e.g. `_static/local.<digest>.css`."""
+    path_ = PurePosixPath(path)
+    return path_.with_name(f"{path_.stem}.{digest}{path_.suffix}").as_posix()
+
+
+def fingerprint(
+    assets: list[T], manifest: Mapping[str, str], filenames: bool = False
+) -> list[T]:
+    """Fingerprint assets linked from a page, such as its `css_files`.
+
+    Parameters
+    ----------
+    assets
+        Assets, either paths or Sphinx assets with a `filename`.
+    manifest
+        Digests of assets, keyed by their paths.
+    filenames
+        Link hashed filenames rather than appending digests as query strings.
+    """
+    fingerprinted: list[Any] = []
+    for asset in assets:
+        path = str(getattr(asset, "filename", asset))
+        if not (digest := manifest.get(path)):
+            fingerprinted.append(asset)
+            continue
+        path = (
+            get_fingerprinted_name(path, digest) if filenames else f"{path}?v={digest}"
+        )
+        if isinstance(asset, str):
+            fingerprinted.append(path)
+            continue
+        fingerprinted.append(
+            type(asset)(path, priority=asset.priority, **asset.attributes)  # pyright: ignore[reportAttributeAccessIssue, reportCallIssue]
+        )
+    return fingerprinted
+
+
+def copy_fingerprinted(outdir: Path, manifest: Mapping[str, str]) -> list[Path]:
+    """Copy assets in a build output to their hashed filenames."""
+    copied: list[Path] = []
+    for path, digest in manifest.items():
+        if (source := outdir / path).exists():
+            destination = outdir / get_fingerprinted_name(path, digest)
+            copyfile(source, destination)
+            copied.append(destination)
+    return copied
@@ -0,0 +1,130 @@
+"""Cached changelog drafts.
+
+Sphinxcontrib-towncrier renders the unreleased changelog draft by running towncrier in
+a subprocess on every build, including every live rebuild. This extension keeps the
+rendered draft on disk, keyed by a hash of the changelog fragments, the towncrier
+template and `[tool.towncrier]`, so that it is only rendered again when one of those
+changes.
+"""
+
+from collections.abc import Callable
+from datetime import date
+from functools import wraps
+from hashlib import sha256
+from importlib.metadata import version
+from inspect import unwrap
+from json import dumps, loads
+from os import getpid
+from pathlib import Path
+from typing import Any, TypeAlias
+
+from sphinx.application import Sphinx
+from sphinxcontrib.towncrier import ext
+
+from dev.docs import DOCS_CACHE, PYPROJECT, get_root
+from dev.tools.metadata import INDEX, get, load_toml
+
+CACHE = DOCS_CACHE / "changelog.json"
+"""Rendered changelog drafts, relative to the project root."""
+FRAGMENTS = "newsfragments"
+"""Default directory of changelog fragments."""
+RENDERER = "_get_changelog_draft_entries"
+"""Name of the changelog draft renderer in `sphinxcontrib.towncrier.ext`."""
+EMPTY = "No significant changes"
+"""Part of a draft rendered without any changelog fragments."""
+
+Render: TypeAlias = Callable[..., str]
+"""Changelog draft renderer, as in `sphinxcontrib.towncrier.ext`."""
+
+
+def setup(app: Sphinx) -> dict[str, Any]:
+    """Set up cached changelog drafts."""
+    app.setup_extension("sphinxcontrib.towncrier")
+    setattr(ext, RENDERER, get_cached_renderer(unwrap(getattr(ext, RENDERER))))
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
+
+
+def get_cached_renderer(render: Render) -> Render:
+    """Get a renderer which only renders drafts if their sources changed."""
+
+    @wraps(render)
+    def get_changelog_draft_entries(
+        target_version: str,
+        allow_empty: bool = False,
+        working_dir: str | None = None,
+        config_path: str | None = None,
+    ) -> str:
+        root = Path(working_dir) if working_dir else Path.cwd()
+        config = root / (config_path or PYPROJECT)
+        digest = get_digest(root, config, target_version)
+        cache = get_root() / CACHE
+        drafts: dict[str, list[str]] = (
+            loads(cache.read_text("utf-8")) if cache.exists() else {}
+        )
+        if (draft := drafts.get(target_version)) and draft[0] == digest:
+            rendered = draft[1]
+        else:
+            rendered = render(
+                target_version,
+                allow_empty=True,
+                working_dir=working_dir,
+                config_path=config_path,
+            )
+            drafts[target_version] = [digest, rendered]
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            temp = cache.with_suffix(f".{getpid()}.tmp")
+            temp.write_text(encoding="utf-8", data=dumps(drafts, indent=2))
+            temp.replace(cache)
+        if not allow_empty and EMPTY in rendered:
+            raise LookupError("There are no unreleased changelog entries so far")
+        return rendered
+
+    return get_changelog_draft_entries
+
+
+def get_digest(root: Path, config: Path, target_version: str) -> str:
+    """Get a hash of the sources of a changelog draft.
+
+    Parameters
+    ----------
+    root
+        Directory towncrier runs in.
+    config
+        Config file containing `[tool.towncrier]`.
+    target_version
+        Version the draft is rendered for.
+
+    Returns
+    -------
+    Hash of `[tool.towncrier]`, the template and fragments, the target version, and
+    today's date, which towncrier renders in the draft.
+    """
+    towncrier = get(config, load_toml, get_root() / INDEX)["tool"]["towncrier"]
+    template = root / towncrier.get("template", "")
+    directory = root / towncrier.get("directory", FRAGMENTS)
+    fragments: list[Path] = sorted(directory.rglob("*")) if directory.exists() else []
+    sources = {
+        "template": get_hash(template) if template.is_file() else "",
+        **{
+            path.relative_to(directory).as_posix(): get_hash(path)
+            for path in fragments
+            if path.is_file()
+        },
+    }
+    return sha256(
+        dumps(
+            [
+                version("towncrier"),
+                date.today().isoformat(),
+                target_version,
+                towncrier,
+                sources,
+            ],
+            sort_keys=True,
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def get_hash(path: Path) -> str:
+    """Get a hash of a file."""
+    return sha256(path.read_bytes()).hexdigest()
@@ -5,16 +5,31 @@ References
 Copyright 2023 Digital Biology, Inc., SPDX-License-Identifier: Apache-2.0, https://github.com/sphinx-extensions2/sphinx-autodoc2/issues/33#issuecomment-1817348449
 """
 
+import ast
+import atexit
+import pickle
 import re
 import textwrap
-from typing import Final
-
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, lru_cache
+from hashlib import sha256
+from itertools import pairwise
+from os import getpid
+from pathlib import Path
+from typing import Final, NamedTuple
+
+from autodoc2.analysis import fix_docstring_indent
 from docutils import nodes
 from myst_parser.parsers.sphinx_ import MystParser
 from numpydoc.docscrape import NumpyDocString, Parameter
 
+from dev.docs import DOCS_CACHE, get_root
 from dev.docs.types import RegularSection, SeeAlsoSection, SingleSeeAlso
 
+CACHE = DOCS_CACHE / "docstrings.pkl"
+"""Docstrings converted to Markdown, relative to the project root."""
+
 _PARAMETERS_SECTIONS: Final[tuple[str, ...]] = (
     "Parameters",
     "Returns",
@@ -31,38 +46,35 @@ _REGULAR_SECTIONS: Final[tuple[str, ...]] = (
     "References",
     "Examples",
 )
-_OTHER_PARAMETERS = re.compile(".*Other Parameters *\n *--+ *\n")
+_PLAIN = re.compile(r"(?:[^\W_]|[ ,;'\"?!%=()/-]|\.(?!\w)|:(?!/))*")
 """
-Regular expression to check if the "Other Parameters" section has been used.
+Regular expression for plain text, which MyST renders as the same text.
 
-We cannot allow users to include "Other Parameters" section, because we hijack it to
-easily render our "Output Files" section without having to patch the NumpyDoc parser.
-
-Matches text that looks like:
-
-```
-Other Parameters
-----------------
-```
+Excludes anything that could be markup, or that the `linkify` extension could turn into
+a link, such as `example.com`.
 """
-_OUTPUT_SECTION_TITLE = re.compile(
-    "(?P<before>.*?)(?P<padding> *)Output Files\n *-+(?P<after>.*)",
-    re.MULTILINE | re.DOTALL,
+_DOCUMENTED: Final[tuple[type[ast.AST], ...]] = (
+    ast.Module,
+    ast.ClassDef,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
 )
+"""Nodes which may have docstrings."""
+_PLACEHOLDER: Final[str] = "dev-docs-parameters-"
+"""Prefix of comments standing in for parameter lists rendered directly as nodes."""
+_OTHER_PARAMETERS: Final[str] = "Other Parameters"
 """
-Regular expression to extract the "Output Files" section title in rST format.
-
-We use this to pretend the "Output Files" section title is actually "Other Parameters"
-before passing it to the NumpyDoc parser.
+Title of the "Other Parameters" section, which must not be used.
 
-Matches text that looks like:
+We cannot allow users to include "Other Parameters" section, because we hijack it to
+easily render our "Output Files" section without having to patch the NumpyDoc parser.
+"""
+_OUTPUT_FILES: Final[str] = "Output Files"
+"""
+Title of the "Output Files" section.
 
-```
-{before}
-{padding}Output Files
-    -------
-{after}
-```
+We pretend the "Output Files" section title is actually "Other Parameters" before
+passing it to the NumpyDoc parser.
 """
 
 
@@ -104,27 +116,227 @@ def render_parameter_section(section: list[Parameter]) -> str:
     return "\n".join(f"- {render_parameter(p)}" for p in section)
 
 
-def report_errors_in_docstring(doc: str, document: nodes.document) -> None:
-    """Warn for docstring errors."""
+class Conversion(NamedTuple):
+    """Docstring converted to Markdown."""
+
+    markdown: str
+    """Markdown."""
+    colon_names: tuple[str, ...]
+    """Parameter names containing colons, likely meant as type annotations."""
+    parameter_lists: tuple[tuple[Parameter, ...], ...] = ()
+    """Plain parameter lists, standing in the Markdown as placeholder comments."""
+
+
+def convert(doc: str, use_other_params_as_outputs: bool = True) -> Conversion:
+    """Convert a hybrid docstring, parsing it once for both validation and rendering.
+
+    Conversions are memoized in memory, and on disk across builds, keyed by a hash of
+    the docstring and of this module.
+    """
+    return _convert(doc, use_other_params_as_outputs)
+
+
+@lru_cache(maxsize=4096)
+def _convert(doc: str, use_other_params_as_outputs: bool) -> Conversion:
+    """Convert a hybrid docstring, consulting the disk cache."""
+    conversions = load_cache(path := get_root() / CACHE)
+    key = get_key(doc, use_other_params_as_outputs)
+    if seen := get_seen(path):
+        # ? Docstrings found only when parsing are seen too, once a build preconverted
+        seen.add(key)
+    if (conversion := conversions.get(key)) is None:
+        conversion = conversions[key] = convert_uncached(
+            doc, use_other_params_as_outputs
+        )
+    return conversion
+
+
+def convert_uncached(doc: str, use_other_params_as_outputs: bool = True) -> Conversion:
+    """Convert a hybrid docstring."""
     parsed = NumpyDocString(doc)
-    for section_title in _PARAMETERS_SECTIONS:
-        for parameter in parsed[section_title]:
-            if ":" in parameter.name and (source := document.current_source):  # pyright: ignore[reportAttributeAccessIssue]
-                document.reporter.warning(
-                    f"Found colon in parameter name ({parameter.name}), please leave a space between the parameter name and the colon if you meant this to be a type annotation.",  # pyright: ignore[reportAttributeAccessIssue]
-                    # If we don't explicitly pass "source" here, then
-                    # `docutils.utils.system_message` will try to find both the source
-                    # and line number. Unfortunately, `autodoc2.sphinx.docstring`
-                    # patches the `get_source_and_line` function, causing this to fail
-                    # for our message since we aren't tracking the line the same way
-                    # `autodoc2` does. To prevent all this mess, we just pass "source".
-                    source=source,
+    parameter_lists: list[tuple[Parameter, ...]] = []
+    return Conversion(
+        markdown=to_pure_markdown(parsed, use_other_params_as_outputs, parameter_lists),
+        colon_names=get_colon_names(parsed),
+        parameter_lists=tuple(parameter_lists),
+    )
+
+
+def get_key(doc: str, use_other_params_as_outputs: bool = True) -> str:
+    """Get the key of a conversion in the cache."""
+    return sha256(f"{use_other_params_as_outputs:d}{doc}".encode()).hexdigest()
+
+
+def preconvert(docs: Iterable[str], jobs: int | None = None) -> int:
+    """Convert docstrings in a process pool, ahead of parsing them.
+
+    Conversions are added to the cache that the parser reads from. Cached conversions
+    of docstrings not given here are dropped when the cache is saved.
+
+    Parameters
+    ----------
+    docs
+        Docstrings to convert.
+    jobs
+        Number of processes. Defaults to the number of CPUs.
+
+    Returns
+    -------
+    Number of docstrings converted, excluding those already cached.
+    """
+    conversions = load_cache(path := get_root() / CACHE)
+    seen = get_seen(path)
+    pending: dict[str, str] = {}
+    for doc in docs:
+        try:
+            doc = replace_output_files_title(doc, None)
+        except ValueError:
+            # ? Reported along with its source when the docstring is parsed
+            continue
+        seen.add(key := get_key(doc))
+        if key not in conversions:
+            pending[key] = doc
+    converted: list[Conversion | None]
+    if len(pending) < 2 or jobs == 1:
+        converted = list(map(try_convert, pending.values()))
+    else:
+        with ProcessPoolExecutor(jobs) as pool:
+            converted = list(
+                pool.map(
+                    try_convert, pending.values(), chunksize=max(1, len(pending) // 256)
                 )
+            )
+    conversions.update(
+        (key, conversion)
+        for key, conversion in zip(pending, converted, strict=True)
+        if conversion
+    )
+    return len(pending)
 
 
-def to_pure_markdown(doc: str, use_other_params_as_outputs: bool = True) -> str:
-    """Convert a hybrid NumpyDoc/MyST docstring to pure Markdown."""
-    parsed = NumpyDocString(doc)
+def try_convert(doc: str) -> Conversion | None:
+    """Convert a hybrid docstring, or leave it to be reported when parsed."""
+    try:
+        return convert_uncached(doc)
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def get_docstrings(paths: Iterable[Path]) -> Iterator[str]:
+    """Get docstrings of modules, classes, functions, and attributes in packages.
+
+    Docstrings are found statically, and cleaned just as `autodoc2` cleans them before
+    parsing, so that they match their conversions in the cache.
+    """
+    for path in paths:
+        for module in sorted(path.rglob("*.py")) if path.is_dir() else [path]:
+            try:
+                tree = ast.parse(module.read_bytes())
+            except (OSError, SyntaxError, ValueError):
+                continue
+            for node in ast.walk(tree):
+                if not isinstance(node, _DOCUMENTED):
+                    continue
+                if doc := fix_docstring_indent(ast.get_docstring(node, clean=False)):
+                    yield doc
+                for previous, current in pairwise(node.body):
+                    if (
+                        isinstance(previous, ast.Assign | ast.AnnAssign)
+                        and isinstance(current, ast.Expr)
+                        and isinstance(current.value, ast.Constant)
+                        and isinstance(current.value.value, str)
+                        and (doc := fix_docstring_indent(current.value.value))
+                    ):
+                        yield doc
+
+
+@cache
+def load_cache(path: Path) -> dict[str, Conversion]:
+    """Load cached conversions once per process, saving them on exit."""
+    try:
+        version, conversions = pickle.loads(path.read_bytes())
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        version, conversions = None, {}
+    if version != get_version():
+        conversions = {}
+    atexit.register(save_cache, path, len(conversions))
+    return conversions
+
+
+@cache
+def get_seen(path: Path) -> set[str]:  # noqa: ARG001
+    """Get keys of conversions seen during a build in this process, per cache."""
+    return set()
+
+
+def save_cache(path: Path, loaded: int = 0):
+    """Save cached conversions if they changed.
+
+    Conversions not seen during a build in this process are dropped, if docstrings were
+    preconverted.
+    """
+    conversions = load_cache(path)
+    stale = conversions.keys() - seen if (seen := get_seen(path)) else set()
+    for key in stale:
+        del conversions[key]
+    if not stale and len(conversions) == loaded:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(f".{getpid()}.tmp")
+    temp.write_bytes(pickle.dumps((get_version(), conversions)))
+    temp.replace(path)
+
+
+@cache
+def get_version() -> str:
+    """Get a hash of this module, invalidating cached conversions when it changes."""
+    return sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def get_colon_names(parsed: NumpyDocString) -> tuple[str, ...]:
+    """Get parameter names containing colons."""
+    return tuple(
+        parameter.name  # pyright: ignore[reportAttributeAccessIssue]
+        for section_title in _PARAMETERS_SECTIONS
+        for parameter in parsed[section_title]
+        if ":" in parameter.name  # pyright: ignore[reportAttributeAccessIssue]
+    )
+
+
+def report_errors_in_docstring(colon_names: Iterable[str], document: nodes.document):
+    """Warn for docstring errors."""
+    for name in colon_names:
+        if source := document.current_source:  # pyright: ignore[reportAttributeAccessIssue]
+            document.reporter.warning(
+                f"Found colon in parameter name ({name}), please leave a space between the parameter name and the colon if you meant this to be a type annotation.",  # pyright: ignore[reportAttributeAccessIssue]
+                # If we don't explicitly pass "source" here, then
+                # `docutils.utils.system_message` will try to find both the source
+                # and line number. Unfortunately, `autodoc2.sphinx.docstring`
+                # patches the `get_source_and_line` function, causing this to fail
+                # for our message since we aren't tracking the line the same way
+                # `autodoc2` does. To prevent all this mess, we just pass "source".
+                source=source,
+            )
+
+
+def to_pure_markdown(
+    doc: str | NumpyDocString,
+    use_other_params_as_outputs: bool = True,
+    parameter_lists: list[tuple[Parameter, ...]] | None = None,
+) -> str:
+    """Convert a hybrid NumpyDoc/MyST docstring to pure Markdown.
+
+    Parameters
+    ----------
+    doc
+        Docstring, or its parsed sections.
+    use_other_params_as_outputs
+        Render the "Other Parameters" section as "Output Files".
+    parameter_lists
+        If given, plain parameter lists are appended to it and stand in the Markdown as
+        placeholder comments, to be rendered directly as nodes.
+    """
+    parsed = NumpyDocString(doc) if isinstance(doc, str) else doc
     result = ""
     if summary := parsed["Summary"]:
         # Can be multiple lines
@@ -137,6 +349,10 @@ def to_pure_markdown(doc: str, use_other_params_as_outputs: bool = True) -> str:
             continue
         if section_title == "Other Parameters" and use_other_params_as_outputs:
             section_title = "Output Files"
+        if parameter_lists is not None and all(map(is_plain, section)):  # pyright: ignore[reportArgumentType]
+            result += f"\n\n# {section_title}\n\n% {_PLACEHOLDER}{len(parameter_lists)}"
+            parameter_lists.append(tuple(section))  # pyright: ignore[reportArgumentType]
+            continue
         result += f"\n\n# {section_title}\n\n{render_parameter_section(section)}"  # pyright: ignore[reportArgumentType]
     for section_title in _REGULAR_SECTIONS:
         if section := parsed[section_title]:
@@ -144,6 +360,52 @@ def to_pure_markdown(doc: str, use_other_params_as_outputs: bool = True) -> str:
     return result
 
 
+def is_plain(parameter: Parameter) -> bool:
+    """Check whether a parameter renders as plain text, free of any markup."""
+    return all(
+        _PLAIN.fullmatch(text)
+        for text in [parameter.name, parameter.type, *parameter.desc]
+    )
+
+
+def render_parameter_nodes(section: Iterable[Parameter]) -> nodes.bullet_list:
+    """Render plain NumpyDoc parameters as nodes, just as MyST renders them from Markdown."""
+    bullet_list = nodes.bullet_list(bullet="-")
+    for parameter in section:
+        parts: list[nodes.Node | str] = []
+        if parameter.name:
+            parts.append(nodes.strong(parameter.name, parameter.name))
+        if parameter.type:
+            parts.extend([" (", nodes.emphasis(parameter.type, parameter.type), ")"])
+        if parameter.desc:
+            parts.append(": " + " ".join(parameter.desc))
+        children: list[nodes.Node] = []
+        for part in parts:
+            if isinstance(part, str) and children and isinstance(children[-1], str):
+                children[-1] = nodes.Text(children[-1] + part)
+                continue
+            children.append(nodes.Text(part) if isinstance(part, str) else part)
+        if children and isinstance(children[0], nodes.Text):
+            children[0] = nodes.Text(children[0].lstrip())
+        if children and isinstance(children[-1], nodes.Text):
+            children[-1] = nodes.Text(children[-1].rstrip())
+        bullet_list += nodes.list_item("", nodes.paragraph("", "", *children))
+    return bullet_list
+
+
+def replace_placeholders(
+    document: nodes.document, parameter_lists: Sequence[Iterable[Parameter]]
+):
+    """Replace placeholder comments with parameter lists rendered as nodes."""
+    for comment in list(document.findall(nodes.comment)):
+        if (text := comment.astext()).startswith(_PLACEHOLDER):
+            parameters = parameter_lists[int(text.removeprefix(_PLACEHOLDER))]
+            bullet_list = render_parameter_nodes(parameters)
+            for node in bullet_list.findall():
+                node.source, node.line = comment.source, comment.line
+            comment.replace_self(bullet_list)
+
+
 def replace_output_files_title(doc: str, source: str | None) -> str:
     """
     Replace "Output Files" section name with "Other Parameters", as a parsing hack.
@@ -163,19 +425,45 @@ def replace_output_files_title(doc: str, source: str | None) -> str:
     -------
     str : A docstring ready to hand to `numpydoc.docscrape.NumpyDocString`.
     """
-    if _OTHER_PARAMETERS.match(doc):
-        source = source or "[UNKNOWN]"
-        raise ValueError(
-            f"Encountered illegal section title 'Other Parameters' when processing source file: {source}\n"
-            "At Digital Biology, we do not use this section. Put **all** parameters in the main 'Parameters' section."
-        )
-    if to_replace := _OUTPUT_SECTION_TITLE.match(doc):
-        group_dict = to_replace.groupdict()
-        before = group_dict["before"]
-        padding = group_dict["padding"]
-        after = group_dict["after"]
-        doc = f"{before}{padding}Other Parameters\n{padding}----------------\n{after}"
-    return doc
+    lines = doc.split("\n")
+    output_files: int | None = None
+    for line, title in get_section_titles(lines):
+        if title == _OTHER_PARAMETERS:
+            source = source or "[UNKNOWN]"
+            raise ValueError(
+                f"Encountered illegal section title 'Other Parameters' when processing source file: {source}\n"
+                "At Digital Biology, we do not use this section. Put **all** parameters in the main 'Parameters' section."
+            )
+        if title == _OUTPUT_FILES and output_files is None:
+            output_files = line
+    if output_files is None:
+        return doc
+    padding = " " * (len(lines[output_files]) - len(lines[output_files].lstrip(" ")))
+    lines[output_files : output_files + 2] = [
+        f"{padding}{_OTHER_PARAMETERS}",
+        f"{padding}{'-' * len(_OTHER_PARAMETERS)}",
+    ]
+    return "\n".join(lines)
+
+
+def get_section_titles(lines: Sequence[str]) -> Iterator[tuple[int, str]]:
+    """Get line numbers and titles of section headers, in one pass over the lines.
+
+    Matches text that looks like:
+
+    ```
+    {padding}{title}
+        -------
+    ```
+    """
+    for line, (text, underline) in enumerate(pairwise(lines)):
+        if (title := text.strip()) and is_underline(underline):
+            yield line, title
+
+
+def is_underline(line: str) -> bool:
+    """Check whether a line underlines a section title."""
+    return bool(stripped := line.strip(" ")) and not stripped.strip("-")
 
 
 class MystNumpyDocHybridParser(MystParser):
@@ -194,9 +482,10 @@ class MystNumpyDocHybridParser(MystParser):
             The root docutils node to add AST elements to.
         """
         inputstring = replace_output_files_title(inputstring, document.source)
-        report_errors_in_docstring(inputstring, document)
-        inputstring = to_pure_markdown(inputstring, use_other_params_as_outputs=True)
-        return super().parse(inputstring, document)
+        conversion = convert(inputstring, use_other_params_as_outputs=True)
+        report_errors_in_docstring(conversion.colon_names, document)
+        super().parse(conversion.markdown, document)
+        replace_placeholders(document, conversion.parameter_lists)
 
 
 Parser = MystNumpyDocHybridParser
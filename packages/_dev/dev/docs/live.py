@@ -0,0 +1,175 @@
+"""Dependency-aware live docs builds.
+
+Like `sphinx-autobuild`, but source changes only trigger a rebuild if a page is
+affected, i.e. if they are to a page or to a file a page depends on, such as a
+documented module or a bibliography. Sphinx then reads only the affected pages again.
+Other changes, such as files written by executing notebooks, are ignored, so notebooks
+stay out of the edit-refresh loop unless they change themselves.
+"""
+
+import pickle
+from collections.abc import Iterable
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from sphinx_autobuild.build import Builder
+from sphinx_autobuild.middleware import JavascriptInjectorMiddleware
+from sphinx_autobuild.server import RebuildServer
+from sphinx_autobuild.utils import find_free_port, show
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.routing import Mount, WebSocketRoute
+from starlette.staticfiles import StaticFiles
+
+ENVIRONMENT = "environment.pickle"
+"""Name of the pickled Sphinx environment in the doctrees directory."""
+IGNORE = ["temp", "data", "apidocs", ".*", "__pycache__", "*schema.json"]
+"""Files and directories to ignore changes in, such as generated sources."""
+SOURCE_SUFFIXES = [".md", ".rst", ".ipynb"]
+"""Default suffixes of page sources."""
+SITE_WIDE = ["conf.py", "_static", "_templates"]
+"""Sources which affect every page."""
+
+
+class DependencyFilter:
+    """Ignore changes to files that no page depends on.
+
+    Parameters
+    ----------
+    srcdir
+        Docs source directory.
+    doctrees
+        Doctrees directory, containing the pickled Sphinx environment.
+    packages
+        Directories of packages documented by `autodoc2`, in which new modules affect
+        pages.
+    ignore
+        Patterns of names of files and directories to ignore changes in.
+    """
+
+    def __init__(
+        self,
+        srcdir: Path,
+        doctrees: Path,
+        packages: Iterable[Path] = (),
+        ignore: Iterable[str] = IGNORE,
+    ):
+        self.srcdir = srcdir.resolve()
+        """Docs source directory."""
+        self.environment = (doctrees / ENVIRONMENT).resolve()
+        """Pickled Sphinx environment."""
+        self.packages = [path.resolve() for path in packages]
+        """Directories of packages documented by `autodoc2`."""
+        self.ignore = list(ignore)
+        """Patterns of names of files and directories to ignore changes in."""
+        self.mtime: float | None = None
+        """Modification time of the environment when dependencies were last loaded."""
+        self.dependencies: set[Path] = set()
+        """Files that pages depend on."""
+        self.suffixes = SOURCE_SUFFIXES
+        """Suffixes of page sources."""
+
+    def __call__(self, path: str) -> bool:
+        """Determine whether a change should be ignored."""
+        path_ = Path(path).resolve()
+        for root in [self.srcdir, *self.packages]:
+            if path_.is_relative_to(root) and any(
+                fnmatch(part, pattern)
+                for part in path_.relative_to(root).parts
+                for pattern in self.ignore
+            ):
+                return True
+        return not self.affects_pages(path_)
+
+    def affects_pages(self, path: Path) -> bool:
+        """Determine whether a change to a file affects any pages."""
+        self.load()
+        if path.is_relative_to(self.srcdir):
+            parts = path.relative_to(self.srcdir).parts
+            if (parts and parts[0] in SITE_WIDE) or path.suffix in self.suffixes:
+                return True
+        if path.suffix == ".py" and any(path.is_relative_to(p) for p in self.packages):
+            return True
+        return path in self.dependencies
+
+    def load(self):
+        """Load dependencies of pages from the environment, if it changed."""
+        if not self.environment.exists():
+            return
+        if (mtime := self.environment.stat().st_mtime) == self.mtime:
+            return
+        environment = pickle.loads(self.environment.read_bytes())
+        self.dependencies = {
+            (self.srcdir / dependency).resolve()
+            for dependencies in environment.dependencies.values()
+            for dependency in dependencies
+        }
+        self.suffixes = list(environment.config.source_suffix or SOURCE_SUFFIXES)
+        self.packages = list(
+            dict.fromkeys([*self.packages, *get_packages(self.srcdir, environment)])
+        )
+        self.mtime = mtime
+
+
+def get_packages(srcdir: Path, environment: Any) -> list[Path]:
+    """Get directories of packages documented by `autodoc2`."""
+    return [
+        (srcdir / (package if isinstance(package, str) else package["path"])).resolve()
+        for package in getattr(environment.config, "autodoc2_packages", [])
+    ]
+
+
+def serve(
+    srcdir: Path,
+    outdir: Path,
+    doctrees: Path,
+    host: str = "127.0.0.1",
+    port: int | None = None,
+):
+    """Build docs, then serve them, rebuilding when pages are affected by changes.
+
+    Parameters
+    ----------
+    srcdir
+        Docs source directory.
+    outdir
+        Output directory.
+    doctrees
+        Doctrees directory, persisting the Sphinx environment between builds.
+    host
+        Host to serve on.
+    port
+        Port to serve on. Defaults to a free port.
+    """
+    # ? Docs config changes directories, so paths are resolved before building
+    srcdir, outdir, doctrees = (path.resolve() for path in (srcdir, outdir, doctrees))
+    outdir.mkdir(parents=True, exist_ok=True)
+    served_port: int = port or find_free_port()
+    url_host = f"{host}:{served_port}"
+    builder = Builder(
+        ["-T", "-d", str(doctrees), str(srcdir), str(outdir)],
+        url_host=url_host,
+        pre_build_commands=[],
+    )
+    show(context="Starting initial build")
+    builder(rebuild=False)
+    ignore = DependencyFilter(srcdir, doctrees)
+    ignore.load()
+    watcher = RebuildServer(
+        [srcdir, *(path for path in ignore.packages if path.exists())],
+        ignore,  # pyright: ignore[reportArgumentType]
+        change_callback=builder,
+    )
+    app = Starlette(
+        routes=[
+            WebSocketRoute("/websocket-reload", watcher, name="reload"),
+            Mount("/", app=StaticFiles(directory=outdir, html=True), name="static"),
+        ],
+        middleware=[Middleware(JavascriptInjectorMiddleware, ws_url=url_host)],
+        # ? Annotated as returning a coroutine, though it is an async context manager
+        lifespan=watcher.lifespan,  # pyright: ignore[reportArgumentType]
+    )
+    show(context="Waiting to detect changes...")
+    uvicorn.run(app, host=host, port=served_port, log_level="warning")
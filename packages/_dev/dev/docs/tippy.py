@@ -0,0 +1,119 @@
+"""Prefetched sphinx-tippy tips.
+
+Sphinx-tippy fetches tips for links to ReadTheDocs sites one at a time, when the
+build finishes, and caches them in the build output. This extension fetches them
+concurrently just before, into a cache that persists across builds and outputs, then
+hands them to sphinx-tippy so that it fetches none itself. Offline builds only use
+cached tips.
+"""
+
+import re
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from json import dumps, loads
+from os import environ
+from pathlib import Path
+from typing import Any
+from urllib.error import URLError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+from sphinx.application import Sphinx
+from sphinx.util.logging import getLogger
+from sphinx_tippy import get_tippy_data
+
+from dev.docs import OFFLINE, TIPS, get_root
+
+RTD_API = "https://readthedocs.org/api/v3/embed/"
+"""ReadTheDocs embed API."""
+CONCURRENCY = 8
+"""Maximum number of tips fetched at once."""
+TIMEOUT = 10
+"""Timeout in seconds of each tip fetched."""
+SPHINX_TIPPY_CACHE = "tippy_rtd_cache.json"
+"""Cache of ReadTheDocs tips that sphinx-tippy keeps in the build output."""
+TAGS = re.compile(r"<[^>]*>")
+"""HTML tags, for checking that tips have text."""
+
+LOGGER = getLogger(__name__)
+
+
+def setup(app: Sphinx) -> dict[str, Any]:
+    """Set up prefetched sphinx-tippy tips."""
+    app.setup_extension("sphinx_tippy")
+    # ? Sphinx-tippy fetches tips when the build finishes, at default priority
+    app.connect("build-finished", prefetch_tips, priority=400)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
+
+
+def prefetch_tips(app: Sphinx, exception: Exception | None):
+    """Fetch tips for every page at once, and hand them to sphinx-tippy."""
+    if exception or app.builder.format != "html":
+        return
+    pages = get_tippy_data(app)["pages"]
+    tips = cache_tips(
+        (url for page in pages.values() for url in page["rtd_urls"]),
+        offline=bool(environ.get(OFFLINE)),
+    )
+    tips = {url: tip for url, tip in tips.items() if TAGS.sub("", tip).strip()}
+    # ? Sphinx-tippy fetches any tips missing from its cache, so leave them out
+    for page in pages.values():
+        page["rtd_urls"] = {url for url in page["rtd_urls"] if url in tips}
+    (path := Path(app.outdir) / SPHINX_TIPPY_CACHE).parent.mkdir(
+        parents=True, exist_ok=True
+    )
+    path.write_text(encoding="utf-8", data=dumps(tips))
+
+
+def cache_tips(
+    urls: Iterable[str],
+    cache: Path | None = None,
+    offline: bool = False,
+    concurrency: int = CONCURRENCY,
+) -> dict[str, str]:
+    """Get tips for links to ReadTheDocs sites, fetching uncached ones concurrently.
+
+    Parameters
+    ----------
+    urls
+        Links to get tips for.
+    cache
+        Cached tips. Defaults to one in the docs cache.
+    offline
+        Only get cached tips.
+    concurrency
+        Maximum number of tips fetched at once.
+
+    Returns
+    -------
+    Tips, by link. Tips that could not be fetched are left out.
+    """
+    cache = cache or get_root() / TIPS
+    tips: dict[str, str] = loads(cache.read_text("utf-8")) if cache.exists() else {}
+    urls = set(urls)
+    if missing := ([] if offline else sorted(urls - tips.keys())):
+        with ThreadPoolExecutor(concurrency) as executor:
+            fetched = dict(zip(missing, executor.map(fetch_tip, missing), strict=True))
+        tips.update({url: tip for url, tip in fetched.items() if tip is not None})
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        temp = cache.with_suffix(".tmp")
+        temp.write_text(encoding="utf-8", data=dumps(tips, indent=2, sort_keys=True))
+        temp.replace(cache)
+    return {url: tips[url] for url in urls if url in tips}
+
+
+def fetch_tip(url: str) -> str | None:
+    """Fetch a tip for a link to a ReadTheDocs site, or `None` if it failed."""
+    request = Request(  # noqa: S310
+        f"{RTD_API}?url={quote(url, safe='')}", headers={"User-Agent": "dev"}
+    )
+    try:
+        with urlopen(request, timeout=TIMEOUT) as response:  # noqa: S310
+            return loads(response.read())["content"]
+    except (URLError, OSError, ValueError, KeyError) as exception:
+        LOGGER.warning(
+            f"Could not fetch RTD data for {url}: {exception} [tippy.rtd]",
+            type="tippy",
+            subtype="rtd",
+        )
+        return None
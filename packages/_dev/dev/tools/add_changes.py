@@ -1,28 +1,139 @@
 """Add changes."""
 
-from dataclasses import dataclass
-from json import loads
+import asyncio
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from json import dumps, loads
+from os import getpid
+from pathlib import Path
 from re import sub
-from shlex import quote, split
-from subprocess import run
 from textwrap import dedent
+from time import time
 from typing import Any, NamedTuple
 from urllib.parse import urlparse
 
 from dulwich.repo import Repo
 
-from dev.tools.types import ChangeType
+from dev.tools.fragments import Fragment, get_index, get_towncrier, write_fragments
+from dev.tools.github import GhTransport, Transport, get_transport
+from dev.tools.types import ChangeType, TransportName
 
+CHANGE_QUERY = """
+    ... on Issue {
+        title
+        timelineItems(itemTypes: CONNECTED_EVENT, first: 1) {
+            nodes {
+                ... on ConnectedEvent {
+                    subject { ... on PullRequest { number title } }
+                }
+            }
+        }
+    }
+    ... on PullRequest { number title }"""
+"""Query for the title of a PR, or of an issue and the first PR connected to it."""
+CHANGES_CACHE = Path(".cache/changes.json")
+"""Changes resolved from issues, cached for offline use."""
+CHANGES_TTL = 7 * 24 * 60 * 60
+"""Time in seconds before cached changes are queried again."""
+ISSUES_PER_QUERY = 50
+"""Maximum number of issues aliased in one query, with batches queried concurrently."""
+MERGES = [
+    re.compile(r"^Merge pull request #(?P<number>\d+) from "),
+    re.compile(r"^Merge branch '(?:[^']*/)?(?P<number>\d+)(?:[-=][^']*)?'"),
+]
+"""Patterns of merge commit messages, matching the PR or the issue of the branch."""
 
-def add_change(typ: ChangeType = "change"):
-    """Add change."""
+
+def add_change(
+    change: ChangeType = "change",
+    offline: bool = False,
+    refresh: bool = False,
+    transport: TransportName = "gh",
+):
+    """Add change.
+
+    Parameters
+    ----------
+    change
+        Type of change.
+    offline
+        Only resolve the change from cache, without querying GitHub.
+    refresh
+        Query GitHub for the change even if it is cached.
+    transport
+        Query GitHub with the GitHub CLI, or over pooled HTTP connections.
+    """
     owner, repo, issue = get_issue_from_active_branch()
-    change = get_change(owner, repo, issue)
-    content = quote(f"{change.name}\n")
-    run(
-        split(f"""towncrier create --content {content} {change.id}.{typ}.md"""),
-        check=True,
+    entry = get_change(
+        owner,
+        repo,
+        issue,
+        offline=offline,
+        refresh=refresh,
+        transport=get_transport(transport),
     )
+    write_fragments([Fragment(str(entry.id), change, entry.name)])
+
+
+def add_changes(
+    since: str,
+    change: ChangeType = "change",
+    offline: bool = False,
+    refresh: bool = False,
+    transport: TransportName = "gh",
+) -> list[str]:
+    """Add changes for every PR or issue branch merged since a tag.
+
+    Parameters
+    ----------
+    since
+        Tag to add changes since.
+    change
+        Type of change.
+    offline
+        Only resolve changes from cache, without querying GitHub.
+    refresh
+        Query GitHub for changes even if they are cached.
+    transport
+        Query GitHub with the GitHub CLI, or over pooled HTTP connections.
+
+    Returns
+    -------
+    Fragments added, skipping changes which already have one.
+    """
+    repository = Repo(".")
+    owner, repo = get_remote(repository)
+    changes = get_changes(
+        owner,
+        repo,
+        get_merged(repository, since),
+        offline=offline,
+        refresh=refresh,
+        transport=get_transport(transport),
+    )
+    towncrier = get_towncrier()
+    existing = {id_ for id_, _ in get_index(towncrier)}
+    fragments = {
+        str(entry.id): Fragment(str(entry.id), change, entry.name)
+        for entry in changes.values()
+        if str(entry.id) not in existing
+    }
+    return [path.name for path in write_fragments(fragments.values(), towncrier)]
+
+
+def get_merged(repository: Repo, since: str) -> Iterator[int]:
+    """Get PRs, or issues of branches, merged since a tag, streaming the history."""
+    try:
+        tag = repository.get_peeled(f"refs/tags/{since}".encode())  # pyright: ignore[reportArgumentType]
+    except KeyError:
+        raise RuntimeError(f"Tag {since!r} not found.") from None
+    for entry in repository.get_walker(include=[repository.head()], exclude=[tag]):
+        message = entry.commit.message.decode("utf-8", errors="replace")
+        for pattern in MERGES:
+            if match := pattern.match(message):
+                yield int(match["number"])
+                break
 
 
 class Issue(NamedTuple):
@@ -39,6 +150,14 @@ class Issue(NamedTuple):
 def get_issue_from_active_branch() -> Issue:
     """Get issue associated with active branch."""
     repository = Repo(".")
+    owner, repo = get_remote(repository)
+    (_, ref), _ = repository.refs.follow(b"HEAD")
+    issue = ref.decode("utf-8").split("/")[-1].split("=")[0].split("-")[0]
+    return Issue(owner, repo, int(issue))
+
+
+def get_remote(repository: Repo) -> tuple[str, str]:
+    """Get owner and name of the `origin` remote of a repository."""
     owner, repo = (
         urlparse(repository.get_config().get(("remote", "origin"), "url"))
         .path.decode("utf-8")
@@ -46,9 +165,7 @@ def get_issue_from_active_branch() -> Issue:
         .strip("/")
         .split("/")
     )
-    (_, ref), _ = repository.refs.follow(b"HEAD")
-    issue = ref.decode("utf-8").split("/")[-1].split("=")[0].split("-")[0]
-    return Issue(owner, repo, issue)
+    return owner, repo
 
 
 @dataclass
@@ -61,63 +178,184 @@ class Change:
     """Name."""
 
 
-def get_change(owner: str, repo: str, issue: int) -> Change:
-    """Get related issue title."""
-    first = 1
-    if nodes := get_connected_prs(owner, repo, issue, first):
-        subject = nodes[0]["subject"]
-        return Change(id=subject["number"], name=subject["title"])
-    return Change(id=issue, name=query_gh_issue(owner, repo, issue)["title"])
+def get_change(
+    owner: str,
+    repo: str,
+    issue: int,
+    offline: bool = False,
+    refresh: bool = False,
+    transport: Transport | None = None,
+) -> Change:
+    """Get the first PR connected to an issue, or else the issue, in one query."""
+    return get_changes(
+        owner, repo, [issue], offline=offline, refresh=refresh, transport=transport
+    )[issue]
 
 
-def get_connected_prs(
-    owner: str, repo: str, issue: int, first: int
-) -> list[dict[str, Any]]:
-    """Get first PR connected to an issue."""
-    return query_gh_issue(
-        owner,
-        repo,
-        issue,
-        query=f"""
-            timelineItems(itemTypes: CONNECTED_EVENT, first: {first}) {{
-                nodes {{
-                    ... on ConnectedEvent {{
-                        subject {{ ... on PullRequest {{ number title }} }}
-                    }}
-                }}
-            }}""",
-    )["timelineItems"]["nodes"]
+def get_changes(
+    owner: str,
+    repo: str,
+    issues: Iterable[int],
+    offline: bool = False,
+    refresh: bool = False,
+    transport: Transport | None = None,
+) -> dict[int, Change]:
+    """Get changes for many issues, querying GitHub once for those not cached.
+
+    Parameters
+    ----------
+    owner
+        Repository owner.
+    repo
+        Repository name.
+    issues
+        Issues to get changes for.
+    offline
+        Only get changes from cache, even if expired, without querying GitHub.
+    refresh
+        Query GitHub for changes even if they are cached.
+    transport
+        Transport for queries. Defaults to the GitHub CLI.
+    """
+    issues = list(dict.fromkeys(issues))
+    cache = load_changes_cache()
+    now = time()
+    changes: dict[int, Change] = {}
+    for issue in issues:
+        if refresh or not (cached := cache.get(f"{owner}/{repo}#{issue}")):
+            continue
+        if offline or now - cached["time"] < CHANGES_TTL:
+            changes[issue] = Change(id=cached["id"], name=cached["name"])
+    if missing := [issue for issue in issues if issue not in changes]:
+        if offline:
+            raise RuntimeError(f"Changes for issues {missing} are not cached.")
+        for issue, change in query_changes(owner, repo, missing, transport).items():
+            changes[issue] = change
+            cache[f"{owner}/{repo}#{issue}"] = {**asdict(change), "time": now}
+        save_changes_cache(cache)
+    return {issue: changes[issue] for issue in issues}
+
+
+def load_changes_cache() -> dict[str, dict[str, Any]]:
+    """Load cached changes, keyed by `owner/repo#issue`."""
+    try:
+        return loads(CHANGES_CACHE.read_text("utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_changes_cache(cache: dict[str, dict[str, Any]]):
+    """Save cached changes, keyed by `owner/repo#issue`."""
+    CHANGES_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    temp = CHANGES_CACHE.with_suffix(f".{getpid()}.tmp")
+    temp.write_text(encoding="utf-8", data=dumps(cache, indent=2))
+    temp.replace(CHANGES_CACHE)
+
+
+def clear_changes_cache(owner: str, repo: str, issues: Iterable[int] | None = None):
+    """Clear cached changes for issues in a repository, or all of its issues."""
+    cache = load_changes_cache()
+    for key in list(cache):
+        if key.startswith(f"{owner}/{repo}#") and (
+            issues is None or int(key.split("#")[-1]) in issues
+        ):
+            del cache[key]
+    save_changes_cache(cache)
+
+
+def query_changes(
+    owner: str, repo: str, issues: Iterable[int], transport: Transport | None = None
+) -> dict[int, Change]:
+    """Query GitHub for changes for many issues in one query."""
+    return {
+        issue: parse_change(issue, data)
+        for issue, data in query_gh_issues(
+            owner, repo, issues, CHANGE_QUERY, transport, "issueOrPullRequest"
+        ).items()
+    }
+
+
+def parse_change(issue: int, data: dict[str, Any]) -> Change:
+    """Parse a change from a PR or issue queried with {data}`CHANGE_QUERY`."""
+    if "number" in data:
+        return Change(id=data["number"], name=data["title"])
+    if nodes := data["timelineItems"]["nodes"]:
+        subject = nodes[0]["subject"]
+        return Change(id=subject["number"], name=subject["title"])
+    return Change(id=issue, name=data["title"])
 
 
 def query_gh_issue(
-    owner: str, repo: str, issue: int, query: str = "title"
+    owner: str,
+    repo: str,
+    issue: int,
+    query: str = "title",
+    transport: Transport | None = None,
+    field: str = "issue",
 ) -> dict[str, Any]:
     """Query GitHub for an issue."""
-    result = run(
-        [
-            "gh",
-            "api",
-            "graphql",
-            "-f",
-            sanitize(f"""query= {{
-                repository(owner:"{owner}", name:"{repo}") {{
-                    issue(number: {issue}) {{ {sanitize(query)} }}
-                }}
-            }}"""),
-        ],
-        capture_output=True,
-        text=True,
-        check=False,
+    return query_gh_issues(owner, repo, [issue], query, transport, field)[issue]
+
+
+def query_gh_issues(
+    owner: str,
+    repo: str,
+    issues: Iterable[int],
+    query: str = "title",
+    transport: Transport | None = None,
+    field: str = "issue",
+) -> dict[int, dict[str, Any]]:
+    """Query GitHub for issues, aliasing each issue by its number.
+
+    Parameters
+    ----------
+    owner
+        Repository owner.
+    repo
+        Repository name.
+    issues
+        Issues to query, in batches of up to {data}`ISSUES_PER_QUERY` queried
+        concurrently.
+    query
+        Query for each issue.
+    transport
+        Transport for queries. Defaults to the GitHub CLI.
+    field
+        Repository field to query by number, e.g. `issueOrPullRequest`.
+    """
+    issues = list(dict.fromkeys(issues))
+    if not issues:
+        return {}
+    queries = [
+        get_issues_query(owner, repo, issues[i : i + ISSUES_PER_QUERY], query, field)
+        for i in range(0, len(issues), ISSUES_PER_QUERY)
+    ]
+    data: dict[str, Any] = {}
+    for result in asyncio.run(gather(transport or GhTransport(), queries)):
+        if not (repository := result.get("repository")):
+            raise RuntimeError("Query does not return a repository.")
+        data.update(repository)
+    if missing := [issue for issue in issues if not data.get(f"issue{issue}")]:
+        raise RuntimeError(f"Query does not return issues: {missing}.")
+    return {issue: data[f"issue{issue}"] for issue in issues}
+
+
+def get_issues_query(
+    owner: str, repo: str, issues: Iterable[int], query: str, field: str = "issue"
+) -> str:
+    """Get a query for issues, aliasing each issue by its number."""
+    aliases = " ".join(
+        f"issue{issue}: {field}(number: {issue}) {{ {sanitize(query)} }}"
+        for issue in issues
     )
-    if result.returncode:
-        raise RuntimeError(result.stderr)
-    data = loads(result.stdout)["data"].get("repository")
-    if not data:
-        raise RuntimeError("Query does not return a repository.")
-    if data := data.get("issue"):
-        return data
-    else:
-        raise RuntimeError("Query does not return an issue.")
+    return sanitize(f"""{{
+        repository(owner:"{owner}", name:"{repo}") {{ {aliases} }}
+    }}""")
+
+
+async def gather(transport: Transport, queries: Iterable[str]) -> list[dict[str, Any]]:
+    """Query GitHub concurrently."""
+    return await asyncio.gather(*(transport.query(query) for query in queries))
 
 
 def sanitize(query: str) -> str:
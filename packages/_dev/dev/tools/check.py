@@ -0,0 +1,228 @@
+"""Concurrent checks."""
+
+import sys
+from collections.abc import Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from json import dumps
+from pathlib import Path
+from subprocess import PIPE, STDOUT, Popen
+from threading import Event, Lock
+from time import perf_counter
+from typing import NamedTuple
+
+from dev.tools.console import log
+
+
+class Task(NamedTuple):
+    """Check task."""
+
+    args: list[str]
+    """Command-line arguments."""
+    needs: tuple[str, ...] = ()
+    """Tasks that must succeed before this one starts."""
+
+
+class Timing(NamedTuple):
+    """Timing of a task, in seconds since checks started."""
+
+    start: float
+    """Start time."""
+    end: float
+    """End time."""
+    code: int | None
+    """Exit code, or `None` if cancelled."""
+
+
+TASKS: dict[str, Task] = {
+    # ? Ruff may fix files, so it runs before anything reads them
+    "ruff": Task(["ruff", "check", "."]),
+    "fawltydeps-src": Task(
+        ["fawltydeps", "--config-file", "pyproject.toml"], needs=("ruff",)
+    ),
+    "fawltydeps-dev": Task(
+        ["fawltydeps", "--config-file", "packages/_dev/pyproject.toml"], needs=("ruff",)
+    ),
+    "pyright": Task(["pyright"], needs=("ruff",)),
+    "pytest": Task(["pytest"], needs=("ruff",)),
+    "docs": Task(["sphinx-build", "-EaT", "docs", "_site"], needs=("ruff",)),
+}
+"""Check tasks and their dependencies."""
+TIMINGS = Path(".cache/check.json")
+"""Timing summary of the last checks."""
+NOT_FOUND = 127
+"""Exit code of tasks which could not be started."""
+
+
+def check(*tasks: str, jobs: int | None = None):
+    """Run checks concurrently, respecting their dependencies.
+
+    Output of each task is prefixed with its name. Remaining tasks are cancelled as soon
+    as any task fails. A timing summary, including the critical path, is written to
+    `.cache/check.json`.
+
+    Parameters
+    ----------
+    tasks
+        Tasks to run, along with the tasks they need. Runs all tasks if none are given.
+    jobs
+        Maximum number of tasks to run at once. Defaults to as many as can run.
+    """
+    selected = select(TASKS, tasks or TASKS)
+    timings = run_tasks(selected, jobs)
+    path = get_critical_path(selected, timings)
+    TIMINGS.parent.mkdir(parents=True, exist_ok=True)
+    TIMINGS.write_text(
+        encoding="utf-8",
+        data=dumps(
+            {
+                "tasks": {name: timing._asdict() for name, timing in timings.items()},
+                "critical_path": path,
+            },
+            indent=2,
+        ),
+    )
+    log(summarize(selected, timings, path))
+    if any(timing.code != 0 for timing in timings.values()) or (
+        len(timings) < len(selected)
+    ):
+        raise SystemExit(1)
+
+
+def select(tasks: Mapping[str, Task], names: Iterable[str]) -> dict[str, Task]:
+    """Select tasks along with the tasks they need."""
+    selected: dict[str, Task] = {}
+    pending = list(names)
+    while pending:
+        if (name := pending.pop()) in selected:
+            continue
+        if name not in tasks:
+            raise ValueError(f"Unknown task '{name}'. Choose from: {', '.join(tasks)}.")
+        selected[name] = tasks[name]
+        pending.extend(tasks[name].needs)
+    return {name: task for name, task in tasks.items() if name in selected}
+
+
+def run_tasks(tasks: Mapping[str, Task], jobs: int | None = None) -> dict[str, Timing]:
+    """Run tasks concurrently as their dependencies succeed, cancelling on failure.
+
+    Parameters
+    ----------
+    tasks
+        Tasks to run.
+    jobs
+        Maximum number of tasks to run at once. Defaults to as many as can run.
+
+    Returns
+    -------
+    Timings of tasks that started, whether they succeeded, failed, or were cancelled.
+    """
+    runner = Runner(max(len(name) for name in tasks))
+    timings: dict[str, Timing] = {}
+    pending = dict(tasks)
+    futures: dict[Future[Timing], str] = {}
+    with ThreadPoolExecutor(max_workers=jobs or len(tasks)) as pool:
+        while True:
+            if not runner.cancelled.is_set():
+                for name, task in list(pending.items()):
+                    if all(
+                        need in timings and timings[need].code == 0
+                        for need in task.needs
+                    ):
+                        del pending[name]
+                        futures[pool.submit(runner.run, name, task.args)] = name
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                timings[name := futures.pop(future)] = future.result()
+                if timings[name].code:
+                    runner.cancel()
+    return timings
+
+
+class Runner:
+    """Run task processes, multiplexing their output and cancelling them together."""
+
+    def __init__(self, width: int):
+        self.width = width
+        """Width of output prefixes."""
+        self.start = perf_counter()
+        """Start time."""
+        self.cancelled = Event()
+        """Set when tasks are cancelled."""
+        self.lock = Lock()
+        """Lock for output and processes."""
+        self.processes: dict[str, Popen[str]] = {}
+        """Running processes."""
+
+    def run(self, name: str, args: list[str]) -> Timing:
+        """Run a task, prefixing its output with its name."""
+        start = perf_counter() - self.start
+        prefix = f"[{name}]".ljust(self.width + 2)
+        with self.lock:
+            if self.cancelled.is_set():
+                return Timing(start, start, None)
+            try:
+                process = self.processes[name] = Popen(  # noqa: S603
+                    args,
+                    stdout=PIPE,
+                    stderr=STDOUT,
+                    text=True,
+                    encoding="utf-8",
+                    errors="replace",
+                )
+            except OSError as exc:
+                sys.stdout.write(f"{prefix} {type(exc).__name__}: {exc}\n")
+                sys.stdout.flush()
+                # ? Shells exit with 127 when a command is not found
+                return Timing(start, perf_counter() - self.start, NOT_FOUND)
+        for line in process.stdout or []:
+            with self.lock:
+                sys.stdout.write(f"{prefix} {line}")
+                sys.stdout.flush()
+        code = process.wait()
+        with self.lock:
+            del self.processes[name]
+        end = perf_counter() - self.start
+        return Timing(start, end, None if code and self.cancelled.is_set() else code)
+
+    def cancel(self):
+        """Cancel running and pending tasks."""
+        with self.lock:
+            self.cancelled.set()
+            for process in self.processes.values():
+                process.terminate()
+
+
+def get_critical_path(
+    tasks: Mapping[str, Task], timings: Mapping[str, Timing]
+) -> list[str]:
+    """Get the chain of dependent tasks which finished last."""
+    if not timings:
+        return []
+    path = [max(timings, key=lambda name: timings[name].end)]
+    while needs := [need for need in tasks[path[0]].needs if need in timings]:
+        path.insert(0, max(needs, key=lambda name: timings[name].end))
+    return path
+
+
+def summarize(
+    tasks: Mapping[str, Task], timings: Mapping[str, Timing], path: list[str]
+) -> list[str]:
+    """Summarize task timings."""
+    width = max(len(name) for name in tasks)
+    lines: list[str] = []
+    for name in tasks:
+        if not (timing := timings.get(name)):
+            lines.append(f"{name.ljust(width)}  skipped")
+            continue
+        status = {None: "cancelled", 0: "passed"}.get(timing.code, "failed")
+        lines.append(
+            f"{name.ljust(width)}  {status:<9}  {timing.end - timing.start:7.2f}s"
+            f"  ({timing.start:.2f}s to {timing.end:.2f}s)"
+        )
+    if path:
+        lines.append(
+            f"Critical path: {' -> '.join(path)} ({timings[path[-1]].end:.2f}s)"
+        )
+    return lines
@@ -0,0 +1,113 @@
+"""Changelog fragments.
+
+Fragments are written in-process according to `pyproject.toml:[tool.towncrier]`,
+rather than through `towncrier create`.
+"""
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from dev.tools.metadata import get_pyproject
+
+
+class Fragment(NamedTuple):
+    """Changelog fragment."""
+
+    id: str
+    """ID, e.g. an issue or PR number."""
+    type: str
+    """Type, one of `[[tool.towncrier.type]]`."""
+    content: str
+    """Content."""
+
+    @property
+    def name(self) -> str:
+        """File name."""
+        return f"{self.id}.{self.type}.md"
+
+
+class Towncrier(NamedTuple):
+    """Towncrier configuration."""
+
+    directory: Path
+    """Directory of fragments."""
+    types: list[str]
+    """Types of fragments."""
+
+
+def get_towncrier(config: dict[str, Any] | None = None) -> Towncrier:
+    """Get towncrier configuration from `pyproject.toml`."""
+    towncrier = (config or get_pyproject())["tool"]["towncrier"]
+    return Towncrier(
+        directory=Path(towncrier["directory"]),
+        types=[type_["directory"] for type_ in towncrier.get("type", [])],
+    )
+
+
+def get_index(towncrier: Towncrier) -> set[tuple[str, str]]:
+    """Get IDs and types of existing fragments, e.g. `1.change.md` as `("1", "change")`.
+
+    Orphan fragments, e.g. `+abc.change.md`, have unique IDs and are not indexed.
+    """
+    if not towncrier.directory.exists():
+        return set()
+    return {
+        (id_, type_)
+        for path in towncrier.directory.iterdir()
+        if (parts := path.name.split("."))[1:]
+        and not (id_ := parts[0]).startswith("+")
+        and (type_ := parts[1]) in towncrier.types
+    }
+
+
+def write_fragments(
+    fragments: Iterable[Fragment], towncrier: Towncrier | None = None
+) -> list[Path]:
+    """Write fragments in one batch, writing none of them if any would be invalid.
+
+    Parameters
+    ----------
+    fragments
+        Fragments to write.
+    towncrier
+        Towncrier configuration. Defaults to the one in `pyproject.toml`.
+
+    Returns
+    -------
+    Fragments written.
+
+    Raises
+    ------
+    ValueError
+        If a fragment has an unknown type.
+    FileExistsError
+        If a fragment with the same ID and type already exists, or is repeated.
+    """
+    towncrier = towncrier or get_towncrier()
+    fragments = list(fragments)
+    index = get_index(towncrier)
+    for fragment in fragments:
+        if fragment.type not in towncrier.types:
+            raise ValueError(
+                f"Unknown fragment type '{fragment.type}'. "
+                f"Choose from: {', '.join(towncrier.types)}."
+            )
+        if (key := (fragment.id, fragment.type)) in index:
+            raise FileExistsError(f"Fragment '{fragment.name}' already exists.")
+        index.add(key)
+    towncrier.directory.mkdir(parents=True, exist_ok=True)
+    temps: list[Path] = []
+    try:
+        for fragment in fragments:
+            temp = towncrier.directory / f".{fragment.name}.tmp"
+            temp.write_text(encoding="utf-8", data=f"{fragment.content.strip()}\n")
+            temps.append(temp)
+    except OSError:
+        for temp in temps:
+            temp.unlink(missing_ok=True)
+        raise
+    return [
+        temp.replace(towncrier.directory / fragment.name)
+        for fragment, temp in zip(fragments, temps, strict=True)
+    ]
@@ -0,0 +1,145 @@
+"""Notebook execution.
+
+Stale notebooks are executed concurrently in a bounded pool of kernels, and cached in
+the same jupyter-cache that myst-nb reads in `cache` mode, so that docs builds only
+render them.
+"""
+
+import asyncio
+from asyncio import CancelledError, Semaphore, create_task, wait
+from contextlib import suppress
+from os import cpu_count
+from pathlib import Path
+from time import perf_counter
+from typing import Any, NamedTuple
+
+from jupyter_cache import get_cache
+from jupyter_cache.base import CacheBundleIn, JupyterCacheAbstract
+from nbclient import NotebookClient
+from nbformat import NO_CONVERT, NotebookNode, read
+
+from dev.docs import DOCS, NOTEBOOK_CACHE, get_root
+
+EXAMPLES = DOCS / "examples"
+"""Example notebooks."""
+TIMEOUT = 600
+"""Default timeout in seconds of each notebook."""
+
+
+class Execution(NamedTuple):
+    """Notebook execution."""
+
+    path: Path
+    """Path to the notebook."""
+    notebook: NotebookNode
+    """Executed notebook."""
+    seconds: float
+    """Time taken to execute."""
+    error: str = ""
+    """Error, if execution failed."""
+
+
+def execute_notebooks(
+    directory: Path = EXAMPLES, kernels: int | None = None, timeout: float = TIMEOUT
+) -> list[str]:
+    """Execute stale notebooks concurrently, caching them for docs builds.
+
+    Parameters
+    ----------
+    directory
+        Directory of notebooks.
+    kernels
+        Maximum number of kernels running at once. Defaults to the number of CPUs.
+    timeout
+        Timeout in seconds of each notebook.
+
+    Returns
+    -------
+    Report of notebooks executed.
+    """
+    cache = get_cache((get_root() / NOTEBOOK_CACHE).as_posix())
+    paths = sorted(directory.rglob("*.ipynb"))
+    stale = get_stale(cache, paths)
+    executions = asyncio.run(
+        execute_all(stale, Semaphore(kernels or cpu_count() or 1), timeout)
+    )
+    report = [
+        f"Executed {len(executions)} of {len(paths)} notebooks,"
+        f" {len(paths) - len(stale)} already cached"
+    ]
+    errors: list[str] = []
+    for execution in executions:
+        if execution.error:
+            errors.append(f"{execution.path.as_posix()}: {execution.error}")
+            continue
+        cache_execution(cache, execution)
+        report.append(f"  {execution.path.as_posix()} ({execution.seconds:.1f}s)")
+    if errors:
+        raise RuntimeError("\n".join(["Notebooks failed to execute:", *errors]))
+    return report
+
+
+def get_stale(
+    cache: JupyterCacheAbstract, paths: list[Path]
+) -> dict[Path, NotebookNode]:
+    """Get notebooks whose code or kernel changed since they were last cached."""
+    stale: dict[Path, NotebookNode] = {}
+    for path in paths:
+        notebook = read(path, NO_CONVERT)
+        try:
+            cache.match_cache_notebook(notebook)
+        except KeyError:
+            stale[path] = notebook
+    return stale
+
+
+async def execute_all(
+    notebooks: dict[Path, NotebookNode], kernels: Semaphore, timeout: float
+) -> list[Execution]:
+    """Execute notebooks concurrently, with at most as many kernels as allowed."""
+    return list(
+        await asyncio.gather(*[
+            execute(path, notebook, kernels, timeout)
+            for path, notebook in notebooks.items()
+        ])
+    )
+
+
+async def execute(
+    path: Path, notebook: NotebookNode, kernels: Semaphore, timeout: float
+) -> Execution:
+    """Execute a notebook in its directory, failing if it runs out of time."""
+    client = NotebookClient(
+        # ? Cell timings would change the hash myst-nb matches notebooks against
+        notebook,
+        record_timing=False,
+        resources={"metadata": {"path": path.parent}},
+    )
+    async with kernels:
+        start = perf_counter()
+        task = create_task(client.async_execute())
+        await wait([task], timeout=timeout)
+        seconds = perf_counter() - start
+        if not task.done():
+            # ? Shutting down the kernel may raise, e.g. that the kernel died
+            task.cancel()
+            with suppress(Exception, CancelledError):
+                await task
+            return Execution(path, notebook, seconds, "Timed out.")
+    if exception := task.exception():
+        return Execution(path, notebook, seconds, str(exception) or repr(exception))
+    return Execution(path, notebook, seconds)
+
+
+def cache_execution(cache: JupyterCacheAbstract, execution: Execution) -> Any:
+    """Cache an executed notebook as myst-nb would, returning its record."""
+    record = cache.add_nb_to_project(execution.path.resolve().as_posix())
+    return cache.cache_notebook_bundle(
+        CacheBundleIn(
+            execution.notebook,
+            record.uri,
+            data={"execution_seconds": execution.seconds},
+        ),
+        check_validity=False,
+        overwrite=True,
+    )
@@ -0,0 +1,19 @@
+"""Settings."""
+
+from pydantic_settings import BaseSettings, InitSettingsSource, SettingsConfigDict
+
+from dev.tools.metadata import get_pyproject
+
+
+class Environment(BaseSettings):
+    """Get environment variables from `pyproject.toml:[tool.env]`."""
+
+    model_config = SettingsConfigDict(extra="allow")
+
+    @classmethod
+    def settings_customise_sources(cls, settings_cls, **_):  # pyright: ignore[reportIncompatibleMethodOverride]
+        """Customize so that all keys are loaded despite not being model fields.
+
+        The table is read from the repository metadata index rather than parsed again.
+        """
+        return (InitSettingsSource(settings_cls, get_pyproject()["tool"]["env"]),)
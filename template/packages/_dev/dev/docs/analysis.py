@@ -0,0 +1,83 @@
+"""Cached autodoc2 analysis.
+
+Autodoc2 analyses every module of a package again whenever any of them changes. This
+extension keeps analyses of each module on disk, keyed by a hash of its source, so
+that only changed modules are parsed again, even in a new build environment.
+"""
+
+import pickle
+from collections.abc import Callable, Iterable
+from functools import cache, wraps
+from hashlib import sha256
+from inspect import unwrap
+from os import getpid
+from pathlib import Path
+from re import Pattern
+from typing import Any, TypeAlias
+
+import autodoc2.sphinx.extension
+from autodoc2 import __version__ as autodoc2_version
+from autodoc2.utils import ItemData
+from sphinx.application import Sphinx
+
+from dev.docs import DOCS_CACHE, get_root
+
+CACHE = DOCS_CACHE / "autodoc2.pkl"
+"""Analyses of modules, relative to the project root."""
+
+Analyse: TypeAlias = Callable[..., Iterable[ItemData]]
+"""Module analyser, as in {func}`autodoc2.analysis.analyse_module`."""
+Analysis: TypeAlias = tuple[str, list[ItemData]]
+"""Hash of a module and its analysis."""
+
+
+def setup(app: Sphinx) -> dict[str, Any]:
+    """Set up cached autodoc2 analysis."""
+    app.setup_extension("autodoc2")
+    autodoc2.sphinx.extension.analyse_module = get_cached_analyser(
+        unwrap(autodoc2.sphinx.extension.analyse_module)
+    )
+    # ? Autodoc2 analyses packages at default priority
+    app.connect("builder-inited", save_analyses, priority=900)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
+
+
+def get_cached_analyser(analyse: Analyse) -> Analyse:
+    """Get an analyser which only analyses modules that changed since last cached."""
+
+    @wraps(analyse)
+    def analyse_module(
+        file_path: Path, name: str, exclude_external_imports: Pattern[str] | None = None
+    ) -> Iterable[ItemData]:
+        analyses = load_analyses(get_root() / CACHE)
+        digest = sha256(file_path.read_bytes()).hexdigest()
+        exclude = exclude_external_imports.pattern if exclude_external_imports else ""
+        key = f"{name}:{exclude}"
+        if (analysis := analyses.get(key)) and analysis[0] == digest:
+            return analysis[1]
+        items = list(analyse(file_path, name, exclude_external_imports))
+        analyses[key] = (digest, items)
+        return items
+
+    return analyse_module
+
+
+@cache
+def load_analyses(path: Path) -> dict[str, Analysis]:
+    """Load cached analyses once per process."""
+    try:
+        version, analyses = pickle.loads(path.read_bytes())
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        version, analyses = None, {}
+    return analyses if version == autodoc2_version else {}
+
+
+def save_analyses(_app: Sphinx):
+    """Save cached analyses if any were loaded or added."""
+    if not load_analyses.cache_info().currsize:
+        return
+    analyses = load_analyses(path := get_root() / CACHE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(f".{getpid()}.tmp")
+    temp.write_bytes(pickle.dumps((autodoc2_version, analyses)))
+    temp.replace(path)
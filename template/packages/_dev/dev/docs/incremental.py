@@ -0,0 +1,90 @@
+"""Content-based incremental builds.
+
+Sphinx reads a document again whenever its source or any of its dependencies were
+modified after it was last read, going by modification times alone. A fresh checkout,
+as in CI, modifies every file, so a restored environment would be read in full again.
+This extension keeps hashes of the sources and dependencies of each document alongside
+the doctrees, and marks documents whose hashes still match as read since they were
+last modified, so that only documents whose contents changed are read again.
+"""
+
+import time
+from collections.abc import Iterable
+from hashlib import sha256
+from json import dumps, loads
+from os import getpid
+from os.path import relpath
+from pathlib import Path
+from typing import Any
+
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+
+HASHES = "hashes.json"
+"""Name of the hashes of document sources and dependencies in the doctrees directory."""
+
+
+def setup(app: Sphinx) -> dict[str, Any]:
+    """Set up content-based incremental builds."""
+    app.connect("builder-inited", mark_unchanged)
+    app.connect("build-finished", save_hashes)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
+
+
+def mark_unchanged(app: Sphinx):
+    """Mark documents as read since last modified if their contents did not change."""
+    if not (path := Path(app.doctreedir) / HASHES).exists():
+        return
+    hashes: dict[str, str] = loads(path.read_text("utf-8"))
+    env = app.env
+    now = time.time_ns() // 1_000
+    for docname in env.all_docs:
+        if docname in env.reread_always:
+            continue
+        files = get_files(env, docname)
+        if all(hashes.get(get_key(env, file)) == get_hash(file) for file in files):
+            # ? Sphinx rounds modification times up to the microsecond
+            env.all_docs[docname] = max(
+                now, *(-(file.stat().st_mtime_ns // -1_000) for file in files)
+            )
+
+
+def save_hashes(app: Sphinx, exception: Exception | None):
+    """Save hashes of the sources and dependencies of every document."""
+    if exception:
+        return
+    env = app.env
+    hashes = {
+        get_key(env, file): digest
+        for docname in env.all_docs
+        for file in get_files(env, docname)
+        if (digest := get_hash(file))
+    }
+    (path := Path(app.doctreedir) / HASHES).parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(f".{getpid()}.tmp")
+    temp.write_text(encoding="utf-8", data=dumps(hashes, indent=2, sort_keys=True))
+    temp.replace(path)
+
+
+def get_files(env: BuildEnvironment, docname: str) -> Iterable[Path]:
+    """Get the source and dependencies of a document."""
+    return [
+        Path(env.doc2path(docname)),
+        *(Path(env.srcdir) / dep for dep in env.dependencies.get(docname, ())),
+    ]
+
+
+def get_key(env: BuildEnvironment, file: Path) -> str:
+    """Get the key of a file, relative to the source directory where possible."""
+    try:
+        return Path(relpath(file, env.srcdir)).as_posix()
+    except ValueError:
+        return file.as_posix()
+
+
+def get_hash(file: Path) -> str:
+    """Get a hash of a file, or an empty string if it is missing."""
+    try:
+        return sha256(file.read_bytes()).hexdigest()
+    except OSError:
+        return ""
@@ -1,7 +1,29 @@
-"""Intersphinx URL handlers."""
+"""Intersphinx URL handlers.
 
+Inventories are cached locally and refreshed once stale, so that builds only download
+them occasionally, and offline builds use the cached inventories alone.
+"""
+
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from os import environ
+from pathlib import Path
+from time import time
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from sphinx.util.logging import getLogger
+
+from dev.docs import INVENTORIES, OFFLINE, get_root
 from dev.docs.types import IspxMappingValue
 
+TTL = 7 * 24 * 60 * 60
+"""Time in seconds before cached inventories are refreshed."""
+TIMEOUT = 10
+"""Timeout in seconds of each inventory download."""
+
+LOGGER = getLogger(__name__)
+
 
 def get_url(url: str, latest: bool = False):
     """Get Intersphinx mapping value for generic URLs."""
@@ -17,3 +39,75 @@ def get_ispx(url: str, latest: bool | None = None):
     """Get Intersphinx mapping value."""
     subpath = f"/{'latest' if latest else 'stable'}" if latest is not None else ""
     return IspxMappingValue(f"https://{url}{subpath}", None)
+
+
+def cache_inventories(
+    mapping: Mapping[str, IspxMappingValue],
+    cache: Path | None = None,
+    ttl: float = TTL,
+    offline: bool | None = None,
+) -> dict[str, IspxMappingValue]:
+    """Get Intersphinx mapping with paths to cached inventories, refreshing stale ones.
+
+    Parameters
+    ----------
+    mapping
+        Intersphinx mapping.
+    cache
+        Directory of cached inventories. Defaults to one in the docs cache.
+    ttl
+        Time in seconds before cached inventories are refreshed.
+    offline
+        Use cached inventories alone, however stale. Defaults to whether the
+        `DEV_DOCS_OFFLINE` environment variable is set.
+
+    Raises
+    ------
+    FileNotFoundError
+        If offline and an inventory was never cached.
+    """
+    cache = cache or get_root() / INVENTORIES
+    offline = bool(environ.get(OFFLINE)) if offline is None else offline
+    paths = {name: cache / f"{name}.inv" for name in mapping}
+    if offline:
+        if missing := [name for name, path in paths.items() if not path.exists()]:
+            raise FileNotFoundError(
+                f"No cached inventories for: {', '.join(missing)}. Build online first."
+            )
+    else:
+        stale = {
+            name: path
+            for name, path in paths.items()
+            if not path.exists() or time() - path.stat().st_mtime > ttl
+        }
+        with ThreadPoolExecutor() as executor:
+            downloaded = executor.map(
+                lambda name: download(mapping[name].url, stale[name]), list(stale)
+            )
+            failed = [
+                name for name, ok in zip(stale, downloaded, strict=True) if not ok
+            ]
+        if failed:
+            LOGGER.warning(
+                f"Could not fetch intersphinx inventories for: {', '.join(failed)}."
+                " Using cached inventories where available."
+            )
+    return {
+        name: IspxMappingValue(value.url, path.as_posix() if path.exists() else None)
+        for (name, value), path in zip(mapping.items(), paths.values(), strict=True)
+    }
+
+
+def download(url: str, path: Path) -> bool:
+    """Download an inventory, keeping a stale one if the download fails."""
+    request = Request(f"{url}/objects.inv", headers={"User-Agent": "dev"})  # noqa: S310
+    try:
+        with urlopen(request, timeout=TIMEOUT) as response:  # noqa: S310
+            contents = response.read()
+    except (URLError, OSError):
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_suffix(".tmp")
+    temp.write_bytes(contents)
+    temp.replace(path)
+    return True
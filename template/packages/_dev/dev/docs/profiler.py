@@ -0,0 +1,201 @@
+"""Sphinx build profiler.
+
+Times every event handler, in total and per document, along with reading each
+document, and reports the timings when the build finishes. Enable it with
+`-D profile_events=1`. Timings from parallel reads are merged back with the
+environments read.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable
+from functools import wraps
+from json import dumps
+from os import getpid
+from time import perf_counter
+from typing import Any
+
+from sphinx.application import Sphinx
+from sphinx.config import Config
+from sphinx.events import EventManager
+
+from dev.docs import PROFILE_REPORT, get_root
+
+DOCNAME_ARGS = {
+    "env-purge-doc": 1,
+    "source-read": 0,
+    "doctree-resolved": 1,
+    "html-page-context": 0,
+}
+"""Position of the document name in arguments of events not emitted while reading."""
+READING = "reading"
+"""Name of the timing of reading a document, from its source to its doctree."""
+TIMINGS = "profiler_timings"
+"""Attribute of environments read in parallel, holding timings to merge back."""
+
+
+class Profiler:
+    """Timings of event handlers and of reading documents."""
+
+    def __init__(self, app: Sphinx):
+        self.app = app
+        """Sphinx application."""
+        self.handlers: defaultdict[str, defaultdict[str, list[float]]] = defaultdict(
+            lambda: defaultdict(lambda: [0, 0.0])
+        )
+        """Number of calls and total time of handlers, by event and handler."""
+        self.documents: defaultdict[str, defaultdict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        """Total time of events, and of reading, by document."""
+        self.reading: dict[str, float] = {}
+        """Start times of documents being read."""
+        self.main = getpid()
+        """Process the profiler was installed in."""
+        self.pid = self.main
+        """Process timings are collected in, differing when reading in parallel."""
+
+    def install(self, events: EventManager):
+        """Time handlers of events as they are emitted, including handlers added later."""
+        emit = events.emit
+
+        @wraps(emit)
+        def timed_emit(name: str, *args: Any, **kwds: Any) -> list[Any]:
+            events.listeners[name] = [
+                listener
+                if hasattr(listener.handler, "__profiled__")
+                else listener._replace(handler=self.time(name, listener.handler))
+                for listener in events.listeners[name]
+            ]
+            return emit(name, *args, **kwds)
+
+        events.emit = timed_emit
+
+    def time(self, event: str, handler: Callable[..., Any]) -> Callable[..., Any]:
+        """Time a handler of an event."""
+        name = get_name(handler)
+
+        @wraps(handler)
+        def timed(app: Sphinx, *args: Any) -> Any:
+            self.check_fork()
+            start = perf_counter()
+            try:
+                return handler(app, *args)
+            finally:
+                seconds = perf_counter() - start
+                timing = self.handlers[event][name]
+                timing[0] += 1
+                timing[1] += seconds
+                if docname := self.get_docname(event, args):
+                    self.documents[docname][event] += seconds
+
+        timed.__profiled__ = True  # pyright: ignore[reportAttributeAccessIssue]
+        return timed
+
+    def get_docname(self, event: str, args: tuple[Any, ...]) -> str | None:
+        """Get the document an event is emitted for, if any."""
+        if (position := DOCNAME_ARGS.get(event)) is not None:
+            return args[position]
+        env = getattr(self.app, "env", None)
+        return env.temp_data.get("docname") if env else None
+
+    def check_fork(self):
+        """Start timings afresh in a process forked to read in parallel."""
+        if (pid := getpid()) == self.pid:
+            return
+        self.pid = pid
+        self.handlers.clear()
+        self.documents.clear()
+
+    def start_reading(self, _app: Sphinx, docname: str, _source: list[str]):
+        """Start timing reading of a document."""
+        self.check_fork()
+        self.reading[docname] = perf_counter()
+
+    def stop_reading(self, app: Sphinx, _doctree: Any):
+        """Stop timing reading of a document, passing timings of parallel reads back."""
+        docname = app.env.docname
+        if (start := self.reading.pop(docname, None)) is not None:
+            self.documents[docname][READING] += perf_counter() - start
+        if self.pid != self.main:
+            setattr(app.env, TIMINGS, self.get_timings())
+
+    def get_timings(self) -> dict[str, Any]:
+        """Get timings, without defaults, e.g. to pickle them."""
+        return {
+            "handlers": {
+                event: {handler: list(timing) for handler, timing in handlers.items()}
+                for event, handlers in self.handlers.items()
+            },
+            "documents": {
+                docname: dict(timings) for docname, timings in self.documents.items()
+            },
+        }
+
+    def merge_timings(self, _app: Sphinx, _env: Any, _docnames: list[str], other: Any):
+        """Merge timings of documents read in parallel."""
+        timings = getattr(other, TIMINGS, {})
+        for event, handlers in timings.get("handlers", {}).items():
+            for handler, (calls, seconds) in handlers.items():
+                timing = self.handlers[event][handler]
+                timing[0] += calls
+                timing[1] += seconds
+        for docname, document in timings.get("documents", {}).items():
+            for event, seconds in document.items():
+                self.documents[docname][event] += seconds
+
+    def get_report(self) -> dict[str, Any]:
+        """Get timings, slowest first."""
+        return {
+            "handlers": {
+                event: {
+                    handler: {"calls": calls, "seconds": seconds}
+                    for handler, (calls, seconds) in sorted(
+                        handlers.items(), key=lambda item: -item[1][1]
+                    )
+                }
+                for event, handlers in sorted(
+                    self.handlers.items(),
+                    key=lambda item: -sum(t[1] for t in item[1].values()),
+                )
+            },
+            "documents": {
+                docname: dict(sorted(timings.items(), key=lambda item: -item[1]))
+                for docname, timings in sorted(
+                    self.documents.items(), key=lambda item: -sum(item[1].values())
+                )
+            },
+        }
+
+    def write_report(self, _app: Sphinx, _exception: Exception | None):
+        """Write timings to the report."""
+        (report := get_root() / PROFILE_REPORT).parent.mkdir(
+            parents=True, exist_ok=True
+        )
+        report.write_text(encoding="utf-8", data=dumps(self.get_report(), indent=2))
+
+
+def get_name(handler: Callable[..., Any]) -> str:
+    """Get the qualified name of a handler."""
+    return ".".join([
+        getattr(handler, "__module__", None) or "",
+        getattr(handler, "__qualname__", None) or repr(handler),
+    ])
+
+
+def install(app: Sphinx, config: Config):
+    """Install the profiler if enabled."""
+    if not config.profile_events:
+        return
+    profiler = Profiler(app)
+    app.connect("source-read", profiler.start_reading, priority=0)
+    app.connect("doctree-read", profiler.stop_reading, priority=1000)
+    app.connect("env-merge-info", profiler.merge_timings)
+    app.connect("build-finished", profiler.write_report, priority=1000)
+    profiler.install(app.events)
+
+
+def setup(app: Sphinx) -> dict[str, Any]:
+    """Set up the profiler extension."""
+    app.add_config_value("profile_events", False, "", bool)
+    app.connect("config-inited", install)
+    return {"parallel_read_safe": True, "parallel_write_safe": True}
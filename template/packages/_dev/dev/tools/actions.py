@@ -0,0 +1,14 @@
+"""GitHub Actions."""
+
+from dev.tools.metadata import get_workflow_actions
+
+
+def get_actions() -> list[str]:
+    """Get actions used by this repository.
+
+    For additional security, select "Allow <user> and select non-<user>, actions and
+    reusable workflows" in the General section of your Actions repository settings, and
+    paste the output of this command into the "Allow specified actions and reusable
+    workflows" block.
+    """
+    return [f"{action}@*," for action in get_workflow_actions()]
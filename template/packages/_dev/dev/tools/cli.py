@@ -0,0 +1,54 @@
+"""Command-line interface."""
+
+from collections.abc import Callable, Sequence
+from functools import wraps
+from importlib import import_module
+from typing import Any
+
+from cyclopts import App
+
+from dev.tools.commands import COMMANDS, get_invoked
+from dev.tools.console import log
+
+
+def get_app() -> App:
+    """Get an app without any commands registered."""
+    return App(help_format="markdown")
+
+
+APP = get_app()
+"""CLI."""
+
+
+def register(app: App, args: Sequence[str]):
+    """Register commands, importing only the one invoked by `args`.
+
+    Other commands are registered as placeholders carrying their help, so that the
+    help page lists every command without importing any of them.
+
+    Parameters
+    ----------
+    app
+        App to register commands to.
+    args
+        Command-line arguments.
+    """
+    invoked = get_invoked(args)
+    for name, command in COMMANDS.items():
+        if name == invoked:
+            app.command(load(command.target), name=name)
+            continue
+        app.command(App(name=name, help=command.help))
+
+
+def load(target: str) -> Callable[..., None]:
+    """Import a command, logging whatever it returns."""
+    module, name = target.split(":")
+    function = getattr(import_module(module), name)
+
+    @wraps(function)
+    def command(*args: Any, **kwargs: Any):
+        if (result := function(*args, **kwargs)) is not None:
+            log(result)
+
+    return command
@@ -0,0 +1,76 @@
+"""Command manifest."""
+
+from collections.abc import Sequence
+from typing import NamedTuple
+
+
+class Command(NamedTuple):
+    """Lazily-imported command."""
+
+    target: str
+    """Import path of the command, e.g. `module:function`."""
+    help: str
+    """Help shown for the command without importing it."""
+    serve: bool = True
+    """Whether the command may be served by a warm `dev serve` daemon."""
+
+
+COMMANDS: dict[str, Command] = {
+    "init-shell": Command("dev.tools.environment:init_shell", "Initialize shell."),
+    "add-change": Command(
+        "dev.tools.add_changes:add_change", "Add change.", serve=False
+    ),
+    "add-changes": Command(
+        "dev.tools.add_changes:add_changes",
+        "Add changes for every PR or issue branch merged since a tag.",
+        serve=False,
+    ),
+    "get-actions": Command(
+        "dev.tools.actions:get_actions", "Get actions used by this repository."
+    ),
+    "sync-local-dev-configs": Command(
+        "dev.tools.configs:sync_local_dev_configs",
+        "Synchronize local dev configs to shadow `pyproject.toml`, with some changes.",
+    ),
+    "elevate-pyright-warnings": Command(
+        "dev.tools.configs:elevate_pyright_warnings",
+        "Elevate Pyright warnings to errors.",
+    ),
+    "watch-configs": Command(
+        "dev.tools.configs:watch_configs",
+        "Regenerate shadow configs when their tables in `pyproject.toml` change.",
+        serve=False,
+    ),
+    "check": Command(
+        "dev.tools.check:check",
+        "Run checks concurrently, respecting their dependencies.",
+        serve=False,
+    ),
+    "build-docs": Command("dev.tools.docs:build_docs", "Build docs.", serve=False),
+    "build-site": Command(
+        "dev.tools.docs:build_site",
+        "Build docs incrementally, only reading documents that changed.",
+        serve=False,
+    ),
+    "profile-docs": Command(
+        "dev.tools.docs:profile_docs",
+        "Profile a full docs build, then view the profile in `snakeviz`.",
+        serve=False,
+    ),
+    "execute-notebooks": Command(
+        "dev.tools.notebooks:execute_notebooks",
+        "Execute stale notebooks concurrently, caching them for docs builds.",
+        serve=False,
+    ),
+    "serve": Command(
+        "dev.tools.daemon:serve",
+        "Serve commands from a warm interpreter over a Unix socket.",
+        serve=False,
+    ),
+}
+"""Commands, only imported when invoked."""
+
+
+def get_invoked(args: Sequence[str]) -> str | None:
+    """Get the name of the command invoked by command-line arguments, if any."""
+    return next((arg for arg in args if not arg.startswith("-")), None)
@@ -0,0 +1,127 @@
+"""Local dev configs."""
+
+from collections.abc import Callable, MutableMapping
+from json import dumps
+from pathlib import Path
+from re import sub
+from shlex import join, split
+from typing import Any
+
+from dev.tools.console import log
+from dev.tools.metadata import PYPROJECT, get_fingerprint, get_pyproject
+
+PYTEST_INI = Path("pytest.ini")
+"""Local pytest configuration, shadowing `pyproject.toml`."""
+PYRIGHTCONFIG = Path("pyrightconfig.json")
+"""Pyright configuration, shadowing `pyproject.toml`."""
+
+
+def sync_local_dev_configs():
+    """Synchronize local dev configs to shadow `pyproject.toml`, with some changes.
+
+    Duplicate pytest configuration from `pyproject.toml` to `pytest.ini`. These files
+    shadow the configuration in `pyproject.toml`, which drives CI or if shadow configs
+    are not present. Shadow configs are in `.gitignore` to facilitate local-only
+    shadowing. Concurrent test runs are disabled in the local pytest configuration which
+    slows down the usual local, granular test workflow.
+    """
+    write_if_changed(PYTEST_INI, get_pytest_ini(get_pyproject()))
+
+
+def get_pytest_ini(config: MutableMapping[str, Any]) -> str:
+    """Get local pytest configuration from `pyproject.toml`."""
+    pytest = config["tool"]["pytest"]["ini_options"]
+    pytest["addopts"] = disable_concurrent_tests(pytest["addopts"])
+    return "\n".join(["[pytest]", *[f"{k} = {v}" for k, v in pytest.items()], ""])
+
+
+def disable_concurrent_tests(addopts: str) -> str:
+    """Normalize `addopts` string and disable concurrent pytest tests."""
+    return sub(pattern=r"-n\s[^\s]+", repl="-n 0", string=join(split(addopts)))
+
+
+def elevate_pyright_warnings():
+    """Elevate Pyright warnings to errors."""
+    write_if_changed(PYRIGHTCONFIG, get_pyrightconfig(get_pyproject()))
+
+
+def get_pyrightconfig(config: MutableMapping[str, Any]) -> str:
+    """Get Pyright configuration from `pyproject.toml`, with warnings elevated."""
+    pyright = config["tool"]["pyright"]
+    for k, v in pyright.items():
+        if (rule := k).startswith("report") and (_level := v) == "warning":
+            pyright[rule] = "error"
+    return dumps(pyright, indent=2)
+
+
+def write_if_changed(path: Path, data: str) -> bool:
+    """Write a file only if its contents would change, preserving its modified time.
+
+    Returns whether the file was written.
+    """
+    if path.exists() and path.read_text("utf-8") == data:
+        return False
+    path.write_text(encoding="utf-8", data=data)
+    return True
+
+
+def watch_configs():
+    """Regenerate shadow configs when their tables in `pyproject.toml` change.
+
+    Regenerates `pytest.ini`, and `pyrightconfig.json` if it exists, e.g. after
+    `elevate-pyright-warnings`. Changes elsewhere in `pyproject.toml` are ignored.
+    """
+    from watchfiles import watch  # noqa: PLC0415
+
+    fingerprints: dict[Path, str] = {}
+    sync_shadow_configs(fingerprints)
+    for _ in watch(
+        PYPROJECT.parent,
+        watch_filter=lambda _, path: Path(path).name == PYPROJECT.name,
+        recursive=False,
+    ):
+        resync_shadow_configs(fingerprints)
+
+
+def resync_shadow_configs(fingerprints: dict[Path, str]) -> list[Path]:
+    """Regenerate shadow configs, skipping an invalid `pyproject.toml` to keep watching.
+
+    Returns shadow configs which were written.
+    """
+    try:
+        return sync_shadow_configs(fingerprints)
+    except (LookupError, ValueError) as exc:
+        log(f"Skipped invalid `{PYPROJECT}`: {type(exc).__name__}: {exc}")
+        return []
+
+
+def sync_shadow_configs(fingerprints: dict[Path, str]) -> list[Path]:
+    """Regenerate shadow configs whose tables changed since they were fingerprinted.
+
+    Parameters
+    ----------
+    fingerprints
+        Fingerprints of the tables last used to generate each shadow config. Updated in
+        place.
+
+    Returns
+    -------
+    Shadow configs which were written.
+    """
+    shadows: dict[Path, tuple[str, Callable[[MutableMapping[str, Any]], str]]] = {
+        PYTEST_INI: ("pytest", get_pytest_ini),
+        PYRIGHTCONFIG: ("pyright", get_pyrightconfig),
+    }
+    written: list[Path] = []
+    config = get_pyproject()
+    for path, (table, get_shadow) in shadows.items():
+        if path == PYRIGHTCONFIG and not path.exists():
+            continue
+        fingerprint = get_fingerprint(config["tool"][table])
+        if fingerprints.get(path) == fingerprint:
+            continue
+        fingerprints[path] = fingerprint
+        if write_if_changed(path, get_shadow(config)):
+            log(f"Updated `{path}`")
+            written.append(path)
+    return written
@@ -0,0 +1,32 @@
+"""Console output."""
+
+import sys
+from collections.abc import Collection
+from pathlib import Path
+from shlex import quote
+
+
+def log(obj):
+    """Send object to `stdout`."""
+    match obj:
+        case str():
+            print(obj)  # noqa: T201
+        case Collection():
+            for o in obj:
+                log(o)
+        case Path():
+            log(escape(obj))
+        case _:
+            print(obj)  # noqa: T201
+
+
+def escape(path: str | Path) -> str:
+    """Escape a path, suitable for passing to e.g. {func}`~subprocess.run`."""
+    return quote(Path(path).as_posix())
+
+
+def get_exit_code(exit_: SystemExit) -> int:
+    """Get the exit code a process reports on exit, reporting messages as it would."""
+    if isinstance(exit_.code, str):
+        print(exit_.code, file=sys.stderr)  # noqa: T201
+    return exit_.code if isinstance(exit_.code, int) else int(bool(exit_.code))
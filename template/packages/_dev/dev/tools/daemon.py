@@ -0,0 +1,138 @@
+"""Warm daemon serving commands over a Unix socket."""
+
+import socket
+import sys
+from collections.abc import Sequence
+from contextlib import chdir, redirect_stderr, redirect_stdout
+from importlib import import_module
+from io import StringIO
+from json import dumps, loads
+from os import environ
+from pathlib import Path
+from socketserver import StreamRequestHandler
+from traceback import print_exc
+from typing import NamedTuple
+
+from dev.tools.commands import COMMANDS, get_invoked
+from dev.tools.console import get_exit_code
+
+SOCKET = Path(".cache/dev.sock")
+"""Socket served by the daemon, relative to the project root."""
+
+
+class Response(NamedTuple):
+    """Response to a command served by the daemon."""
+
+    stdout: str
+    """Output."""
+    stderr: str
+    """Errors."""
+    code: int
+    """Exit code."""
+
+
+def forward(args: Sequence[str], path: Path = SOCKET) -> int | None:
+    """Forward a command to a running daemon, and return its exit code.
+
+    Returns `None` if the command should run in this process instead, either because
+    it is not served by the daemon, or because no daemon is running.
+
+    Parameters
+    ----------
+    args
+        Command-line arguments.
+    path
+        Socket served by the daemon.
+    """
+    command = COMMANDS.get(get_invoked(args) or "")
+    if not (command and command.serve and hasattr(socket, "AF_UNIX")):
+        return None
+    if not path.exists():
+        return None
+    request = dumps({"args": list(args), "cwd": str(Path.cwd()), "env": dict(environ)})
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(path))
+            client.sendall(f"{request}\n".encode())
+            client.shutdown(socket.SHUT_WR)
+            response = Response(**loads(client.makefile("rb").read()))
+    except (OSError, ValueError):
+        return None
+    sys.stdout.write(response.stdout)
+    sys.stderr.write(response.stderr)
+    return response.code
+
+
+def serve(path: Path = SOCKET):
+    """Serve commands from a warm interpreter over a Unix socket.
+
+    Commands are preloaded, and invocations of `dev` in this directory are forwarded
+    here while the daemon is running. Otherwise, `dev` runs commands in-process.
+
+    Parameters
+    ----------
+    path
+        Socket to serve.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Unix sockets are not supported on this platform.")
+    # ? Only defined where Unix sockets are supported
+    from socketserver import UnixStreamServer  # noqa: PLC0415
+
+    import_module("dev.tools.cli")
+    for command in COMMANDS.values():
+        if command.serve:
+            import_module(command.target.split(":")[0])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    try:
+        with UnixStreamServer(str(path), Handler) as server:
+            server.serve_forever()
+    finally:
+        path.unlink(missing_ok=True)
+
+
+class Handler(StreamRequestHandler):
+    """Handle a command forwarded to the daemon."""
+
+    def handle(self):
+        """Handle a command forwarded to the daemon."""
+        request = loads(self.rfile.readline())
+        response = execute(request["args"], request["cwd"], request["env"])
+        self.wfile.write(dumps(response._asdict()).encode())
+
+
+def execute(args: Sequence[str], cwd: str, env: dict[str, str]) -> Response:
+    """Execute a command in this process, as if invoked in another.
+
+    Parameters
+    ----------
+    args
+        Command-line arguments.
+    cwd
+        Working directory of the invoking process.
+    env
+        Environment variables of the invoking process.
+    """
+    from dev.tools.cli import get_app, register  # noqa: PLC0415
+
+    out, err = StringIO(), StringIO()
+    code = 0
+    original_env = dict(environ)
+    environ.clear()
+    environ.update(env)
+    try:
+        with chdir(cwd), redirect_stdout(out), redirect_stderr(err):
+            try:
+                app = get_app()
+                register(app, args)
+                app(args)
+            except SystemExit as exit_:
+                code = get_exit_code(exit_)
+            except Exception:  # noqa: BLE001
+                print_exc()
+                code = 1
+    finally:
+        environ.clear()
+        environ.update(original_env)
+    return Response(out.getvalue(), err.getvalue(), code)
@@ -0,0 +1,121 @@
+"""Documentation builds."""
+
+from hashlib import sha256
+from json import loads
+from os import environ
+from pathlib import Path
+from shutil import rmtree
+
+from dev.docs import (
+    DOCS,
+    DOCS_CACHE,
+    INVENTORIES,
+    NOTEBOOK_CACHE,
+    OFFLINE,
+    PROFILE,
+    PROFILE_REPORT,
+    READ_REPORT,
+)
+from dev.tools.environment import run
+
+SITE = Path("_site")
+"""Built docs."""
+ENVIRONMENT_KEYS = [DOCS / "conf.py", Path("pyproject.toml"), Path("uv.lock")]
+"""Files which invalidate the whole docs environment when they change."""
+SHARED = [NOTEBOOK_CACHE.name, INVENTORIES.name, PROFILE.name]
+"""Docs caches shared across environments."""
+
+
+def build_docs():
+    """Build docs, then serve them, rebuilding when pages are affected by changes.
+
+    Changes only trigger a rebuild if a page depends on them, and only pages depending
+    on them are read again, so notebooks stay out of the loop unless they change.
+    """
+    from dev.docs.live import serve  # noqa: PLC0415
+
+    serve(DOCS, SITE, get_doctrees())
+
+
+def build_site(output: Path = SITE, offline: bool = False) -> list[str]:
+    """Build docs incrementally, only reading documents that changed.
+
+    The environment and doctrees persist in `.cache/docs/<key>`, keyed by a hash of
+    the docs config and locked dependencies, so that CI can restore them. Documents are
+    only read again if the contents of their sources or dependencies changed since, even
+    if a fresh checkout modified them.
+
+    Parameters
+    ----------
+    output
+        Output directory.
+    offline
+        Build from cached intersphinx inventories and tips, without network access.
+
+    Returns
+    -------
+    Report of documents read.
+    """
+    if offline:
+        environ[OFFLINE] = "1"
+    doctrees = get_doctrees()
+    READ_REPORT.unlink(missing_ok=True)
+    run(["sphinx", "-T", "-d", doctrees.as_posix(), DOCS.as_posix(), output.as_posix()])
+    read: list[str] = (
+        loads(READ_REPORT.read_text("utf-8")) if READ_REPORT.exists() else []
+    )
+    return [f"Read {len(read)} documents", *[f"  {doc}" for doc in read]]
+
+
+def profile_docs(view: bool = True) -> list[str]:
+    """Profile a full docs build, then view the profile in `snakeviz`.
+
+    Event handlers are also timed per document, and reported to
+    `.cache/docs/profile/events.json`.
+
+    Parameters
+    ----------
+    view
+        View the profile in `snakeviz`.
+
+    Returns
+    -------
+    Slowest event handlers.
+    """
+    # ? Docs config changes directories, so the profile is written to an absolute path
+    profile = (PROFILE / "build.prof").resolve()
+    PROFILE_REPORT.unlink(missing_ok=True)
+    run([
+        *["cProfile", "-o", profile.as_posix(), "-m", "sphinx", "-ET"],
+        *["-D", "profile_events=1", "-d", (PROFILE / "doctrees").as_posix()],
+        *[DOCS.as_posix(), (PROFILE / SITE).as_posix()],
+    ])
+    handlers = sorted(
+        (
+            (timing["seconds"], event, handler)
+            for event, timings in loads(PROFILE_REPORT.read_text("utf-8"))[
+                "handlers"
+            ].items()
+            for handler, timing in timings.items()
+        ),
+        reverse=True,
+    )
+    if view:
+        run(["snakeviz", profile.as_posix()])
+    return [
+        f"{seconds:8.3f}s {event} {handler}"
+        for seconds, event, handler in handlers[:10]
+    ]
+
+
+def get_doctrees(keys: list[Path] = ENVIRONMENT_KEYS) -> Path:
+    """Get the doctrees directory for the current environment, pruning stale ones."""
+    digest = sha256()
+    for path in keys:
+        digest.update(path.read_bytes() if path.exists() else b"")
+    key = digest.hexdigest()[:16]
+    if DOCS_CACHE.exists():
+        for path in DOCS_CACHE.iterdir():
+            if path.is_dir() and path.name not in {key, *SHARED}:
+                rmtree(path)
+    return DOCS_CACHE / key / "doctrees"
@@ -1,59 +1,118 @@
 """Contributor environment."""
 
+import re
 import subprocess
+import sys
 from collections.abc import Iterable
 from contextlib import chdir, nullcontext
 from io import StringIO
 from pathlib import Path
-from shlex import quote
+from runpy import run_module
+from shlex import quote, split
 from sys import executable
+from traceback import print_exc
 
 from dotenv import load_dotenv
-from pydantic_settings import (
-    BaseSettings,
-    PyprojectTomlConfigSettingsSource,
-    SettingsConfigDict,
-)
+
+from dev.tools.console import get_exit_code
+from dev.tools.metadata import get_fingerprint, get_pyproject
+
+ENV_CACHE = Path(".cache/init-shell.env")
+"""Cached dotenv output of `pyproject.toml:[tool.env]`, headed by its fingerprint."""
+SHELL_SYNTAX = re.compile(r"[|&;<>()$`{}]")
+"""Characters that need shell semantics in commands passed to {func}`run`."""
 
 
 def init_shell(path: Path | None = None) -> str:
     """Initialize shell."""
     with chdir(path) if path else nullcontext():
-        environment = Environment().model_dump()
-        dotenv = "\n".join(f"{k}={v}" for k, v in environment.items())
+        dotenv = get_dotenv()
         load_dotenv(stream=StringIO(dotenv))
         return dotenv
 
 
-def run(args: str | Iterable[str] | None = None):
-    """Run command."""
-    sep = " "
-    subprocess.run(
-        check=True,
-        args=[
-            "pwsh",
-            "-Command",
-            sep.join([
-                f"& {quote(executable)} -m",
-                *(([args] if isinstance(args, str) else args) or []),
-            ]),
-        ],
-    )
+def get_dotenv() -> str:
+    """Get `pyproject.toml:[tool.env]` as dotenv, cached on a fingerprint of the table.
+
+    On a cache hit, settings are not resolved at all, skipping the import of
+    `pydantic_settings`.
+    """
+    env = get_pyproject()["tool"]["env"]
+    header = f"# {get_fingerprint(env)}"
+    if ENV_CACHE.exists():
+        cached_header, _, cached = ENV_CACHE.read_text("utf-8").partition("\n")
+        if cached_header == header:
+            return cached
+    from dev.tools.settings import Environment  # noqa: PLC0415
+
+    dotenv = "\n".join(f"{k}={v}" for k, v in Environment().model_dump().items())
+    ENV_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    ENV_CACHE.write_text(encoding="utf-8", data=f"{header}\n{dotenv}")
+    return dotenv
 
 
-class Environment(BaseSettings):
-    """Get environment variables from `pyproject.toml:[tool.env]`."""
+def run(args: str | Iterable[str] | None = None, in_process: bool = False):
+    """Run a module as in `python -m`.
 
-    model_config = SettingsConfigDict(
-        extra="allow", pyproject_toml_table_header=("tool", "env")
+    Modules run directly, without a shell. Only a command line given as a string which
+    needs shell semantics such as pipes, redirection, or variables is run in `pwsh`.
+
+    Parameters
+    ----------
+    args
+        Module and its arguments, passed through as they are, or a command line, split
+        as a shell would.
+    in_process
+        Run the module in this interpreter with {func}`runpy.run_module` instead of
+        starting another one. Ignored if arguments need shell semantics.
+    """
+    if isinstance(args, str):
+        if SHELL_SYNTAX.search(args):
+            run_shell(args)
+            return
+        args = split_command(args)
+    args = list(args or [])
+    if in_process:
+        run_in_process(args)
+    else:
+        subprocess.run(check=True, args=[executable, "-m", *args])
+
+
+def split_command(command: str) -> list[str]:
+    """Split a command line as a shell would, keeping backslashes in Windows paths."""
+    if sys.platform != "win32":
+        return split(command)
+    return [
+        arg[1:-1] if len(arg) > 1 and arg[0] == arg[-1] and arg[0] in "\"'" else arg
+        for arg in split(command, posix=False)
+    ]
+
+
+def run_shell(command: str):
+    """Run a module as in `python -m` in `pwsh`."""
+    subprocess.run(
+        check=True, args=["pwsh", "-Command", f"& {quote(executable)} -m {command}"]
     )
 
-    @classmethod
-    def settings_customise_sources(cls, settings_cls, **_):  # pyright: ignore[reportIncompatibleMethodOverride]
-        """Customize so that all keys are loaded despite not being model fields."""
-        return (PyprojectTomlConfigSettingsSource(settings_cls),)
 
+def run_in_process(args: list[str]):
+    """Run a module as in `python -m`, but in this interpreter.
 
-def escape(path: str | Path) -> str:
-    """Escape a path, suitable for passing to e.g. {func}`~subprocess.run`."""
-    return quote(Path(path).as_posix())
+    Exit codes and uncaught exceptions are reported as {func}`subprocess.run` would with
+    `check=True`.
+    """
+    module, *module_args = args
+    argv = sys.argv
+    sys.argv = [module, *module_args]
+    try:
+        run_module(module, run_name="__main__", alter_sys=True)
+    except SystemExit as exit_:
+        if code := get_exit_code(exit_):
+            raise subprocess.CalledProcessError(
+                code, [executable, "-m", *args]
+            ) from None
+    except Exception as exc:
+        print_exc()
+        raise subprocess.CalledProcessError(1, [executable, "-m", *args]) from exc
+    finally:
+        sys.argv = argv
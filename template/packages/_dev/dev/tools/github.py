@@ -0,0 +1,226 @@
+"""GitHub GraphQL transports."""
+
+import asyncio
+from asyncio import Semaphore, create_subprocess_exec, get_running_loop, sleep
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from json import dumps, loads
+from os import environ
+from subprocess import PIPE, run
+from time import time
+from typing import Any, Protocol
+from urllib.parse import urlsplit
+
+from dev.tools.types import TransportName
+
+GH = ["gh"]
+"""GitHub CLI."""
+API = "https://api.github.com/graphql"
+"""GitHub GraphQL API."""
+RATE_LIMIT_STATUSES = {403, 429}
+"""HTTP statuses GitHub may respond with when rate-limiting."""
+
+
+class Transport(Protocol):
+    """Transport for GitHub GraphQL queries."""
+
+    async def query(self, query: str) -> dict[str, Any]:
+        """Query GitHub, returning the data of the response."""
+        ...
+
+
+def get_transport(name: TransportName = "gh") -> Transport:
+    """Get a transport by name."""
+    return {"gh": GhTransport, "http": HttpTransport}[name]()
+
+
+class GhTransport:
+    """Query GitHub through the GitHub CLI, spawning a process for each query."""
+
+    def __init__(self, concurrency: int = 4):
+        self.limit = Limit(concurrency)
+        """Limit on processes running at once."""
+
+    async def query(self, query: str) -> dict[str, Any]:
+        """Query GitHub, returning the data of the response."""
+        async with self.limit.get():
+            process = await create_subprocess_exec(
+                *GH, "api", "graphql", "-f", f"query={query}", stdout=PIPE, stderr=PIPE
+            )
+            stdout, stderr = await process.communicate()
+        if process.returncode:
+            raise RuntimeError(stderr.decode("utf-8"))
+        return loads(stdout)["data"]
+
+
+class HttpTransport:
+    """Query GitHub over a pool of keep-alive HTTP connections.
+
+    Connections are reused across queries, and across event loops, so that each query
+    costs a request rather than a process spawn and a handshake. Rate-limited queries
+    are retried after the delay GitHub asks for.
+
+    Parameters
+    ----------
+    url
+        GraphQL endpoint.
+    token
+        Token to authenticate with. Defaults to `GH_TOKEN`, `GITHUB_TOKEN`, or the token
+        of the GitHub CLI.
+    connections
+        Maximum number of connections, and so of queries in flight.
+    retries
+        Maximum number of retries of a rate-limited query.
+    max_delay
+        Maximum time in seconds to wait before retrying a rate-limited query.
+    timeout
+        Timeout in seconds of each request.
+    """
+
+    def __init__(
+        self,
+        url: str = API,
+        token: str | None = None,
+        connections: int = 4,
+        retries: int = 3,
+        max_delay: float = 60,
+        timeout: float = 30,
+    ):
+        self.url = urlsplit(url)
+        """GraphQL endpoint."""
+        self.token = token
+        """Token to authenticate with."""
+        self.retries = retries
+        """Maximum number of retries of a rate-limited query."""
+        self.max_delay = max_delay
+        """Maximum time in seconds to wait before retrying a rate-limited query."""
+        self.timeout = timeout
+        """Timeout in seconds of each request."""
+        self.limit = Limit(connections)
+        """Limit on connections in use."""
+        self.idle: list[HTTPConnection] = []
+        """Idle connections."""
+
+    async def query(self, query: str) -> dict[str, Any]:
+        """Query GitHub, returning the data of the response."""
+        self.token = self.token or get_token()
+        body = dumps({"query": query}).encode("utf-8")
+        async with self.limit.get():
+            connection = self.idle.pop() if self.idle else self.connect()
+            try:
+                status, response = await self.request(connection, body)
+            finally:
+                self.idle.append(connection)
+        if status != 200:
+            raise RuntimeError(f"HTTP {status}: {response.decode('utf-8')}")
+        result = loads(response)
+        if errors := result.get("errors"):
+            raise RuntimeError(dumps(errors))
+        return result["data"]
+
+    async def request(
+        self, connection: HTTPConnection, body: bytes
+    ) -> tuple[int, bytes]:
+        """Request a query, retrying while rate-limited."""
+        for attempt in range(self.retries + 1):
+            status, headers, response = await asyncio.to_thread(
+                self.post, connection, body
+            )
+            delay = get_retry_delay(status, headers, response, attempt)
+            if delay is None:
+                return status, response
+            if attempt == self.retries or delay > self.max_delay:
+                break
+            await sleep(delay)
+        raise RuntimeError(f"Rate limited, retry in {delay:.0f}s.")  # pyright: ignore[reportPossiblyUnboundVariable]
+
+    def connect(self) -> HTTPConnection:
+        """Open a connection to the endpoint."""
+        cls = HTTPSConnection if self.url.scheme == "https" else HTTPConnection
+        return cls(self.url.netloc, timeout=self.timeout)
+
+    def post(
+        self, connection: HTTPConnection, body: bytes
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Post a query, reconnecting once if a kept-alive connection went stale."""
+        headers = {
+            "Authorization": f"bearer {self.token}",
+            "Content-Type": "application/json",
+            "User-Agent": "dev",
+        }
+        for reconnect in [True, False]:
+            try:
+                connection.request("POST", self.url.path or "/", body, headers)
+                response = connection.getresponse()
+                return (
+                    response.status,
+                    {k.lower(): v for k, v in response.getheaders()},
+                    response.read(),
+                )
+            except (HTTPException, ConnectionError):
+                connection.close()
+                if not reconnect:
+                    raise
+        raise AssertionError("Unreachable.")
+
+    def close(self):
+        """Close idle connections."""
+        while self.idle:
+            self.idle.pop().close()
+
+
+class Limit:
+    """Limit on concurrency, usable from one event loop at a time."""
+
+    def __init__(self, value: int):
+        self.value = value
+        """Maximum number of holders at once."""
+        self.loop: asyncio.AbstractEventLoop | None = None
+        """Event loop the semaphore belongs to."""
+        self.semaphore = Semaphore(value)
+        """Semaphore for the current event loop."""
+
+    def get(self) -> Semaphore:
+        """Get the semaphore for the running event loop."""
+        if (loop := get_running_loop()) is not self.loop:
+            self.loop, self.semaphore = loop, Semaphore(self.value)
+        return self.semaphore
+
+
+def get_retry_delay(
+    status: int, headers: dict[str, str], response: bytes, attempt: int
+) -> float | None:
+    """Get the delay before retrying a rate-limited response, or `None` if not limited.
+
+    Parameters
+    ----------
+    status
+        HTTP status.
+    headers
+        Response headers, with lowercase names.
+    response
+        Response body.
+    attempt
+        Number of attempts before this one, for exponential backoff.
+    """
+    limited = b'"RATE_LIMITED"' in response
+    if status not in RATE_LIMIT_STATUSES and not limited:
+        return None
+    if retry_after := headers.get("retry-after"):
+        return float(retry_after)
+    if headers.get("x-ratelimit-remaining") == "0" and (
+        reset := headers.get("x-ratelimit-reset")
+    ):
+        return max(0.0, float(reset) - time())
+    if status == 429 or limited:
+        return float(2**attempt)
+    return None
+
+
+def get_token() -> str:
+    """Get a GitHub token from the environment or the GitHub CLI."""
+    if token := environ.get("GH_TOKEN") or environ.get("GITHUB_TOKEN"):
+        return token
+    result = run([*GH, "auth", "token"], capture_output=True, text=True, check=False)  # noqa: S603
+    if result.returncode:
+        raise RuntimeError(result.stderr)
+    return result.stdout.strip()
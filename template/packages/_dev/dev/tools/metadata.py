@@ -0,0 +1,97 @@
+"""Repository metadata index.
+
+Parsed contents of files such as `pyproject.toml` and workflows are kept in an index
+keyed by hashes of the files, so that a chain of commands parses each file once.
+"""
+
+import pickle
+from collections.abc import Callable
+from copy import deepcopy
+from functools import cache
+from hashlib import sha256
+from json import dumps
+from os import getpid
+from pathlib import Path
+from re import finditer
+from sys import version_info
+from typing import Any, TypeAlias, TypeVar
+
+if version_info >= (3, 11):  # noqa: UP036, RUF100
+    from tomllib import loads as load_toml  # pyright: ignore[reportMissingImports]
+else:
+    from toml import loads as load_toml  # pyright: ignore[reportMissingModuleSource]
+
+INDEX = Path(".cache/metadata.pkl")
+"""Repository metadata index."""
+PYPROJECT = Path("pyproject.toml")
+"""Project configuration."""
+WORKFLOWS = Path(".github/workflows")
+"""GitHub Actions workflows."""
+
+T = TypeVar("T")
+Key: TypeAlias = tuple[str, str]
+"""Index key, the path to a file and the name of its parser."""
+Entry: TypeAlias = tuple[str, Any]
+"""Index entry, the hash of a file and its parsed contents."""
+
+
+def get_pyproject(path: Path = PYPROJECT) -> dict[str, Any]:
+    """Get parsed `pyproject.toml`."""
+    return get(path, load_toml)
+
+
+def get_workflow_actions(workflows: Path = WORKFLOWS) -> list[str]:
+    """Get actions used by workflows."""
+    return sorted({
+        action
+        for path in sorted(workflows.iterdir())
+        for action in get(path, parse_actions)
+    })
+
+
+def parse_actions(contents: str) -> list[str]:
+    """Parse actions used by a workflow."""
+    return [
+        match["action"] for match in finditer(r'uses:\s?"?(?P<action>.+)@', contents)
+    ]
+
+
+def get(path: Path, parse: Callable[[str], T], index: Path = INDEX) -> T:
+    """Get parsed contents of a file, only parsing it if it changed since last indexed.
+
+    Parameters
+    ----------
+    path
+        File to parse.
+    parse
+        Parser for the contents of the file.
+    index
+        Index of parsed files.
+    """
+    contents = path.read_bytes()
+    digest = sha256(contents).hexdigest()
+    entries = load_index(index.resolve())
+    key = (path.as_posix(), f"{parse.__module__}.{parse.__qualname__}")
+    if (entry := entries.get(key)) and entry[0] == digest:
+        return deepcopy(entry[1])
+    data = parse(contents.decode("utf-8"))
+    entries[key] = (digest, data)
+    index.parent.mkdir(parents=True, exist_ok=True)
+    temp = index.with_suffix(f".{getpid()}.tmp")
+    temp.write_bytes(pickle.dumps(entries))
+    temp.replace(index)
+    return deepcopy(data)
+
+
+def get_fingerprint(table: Any) -> str:
+    """Get a fingerprint of a parsed table, e.g. from `pyproject.toml`."""
+    return sha256(dumps(table, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@cache
+def load_index(index: Path) -> dict[Key, Entry]:
+    """Load the index, once per process."""
+    try:
+        return pickle.loads(index.read_bytes())
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return {}
@@ -12,6 +12,8 @@ ops: tuple[Op, ...] = (" @ ", "==")
 """Allowable operators."""
 ChangeType: TypeAlias = Literal["breaking", "deprecation", "change"]
 """Type of change to add to changelog."""
+TransportName: TypeAlias = Literal["gh", "http"]
+"""Transport for GitHub queries, the GitHub CLI or pooled HTTP connections."""
 Action: TypeAlias = Literal["default", "error", "ignore", "always", "module", "once"]
 """Action to take for a warning."""
 
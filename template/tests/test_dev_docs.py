@@ -0,0 +1,510 @@
+"""Tests for docs tools."""
+
+import json
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import utime
+from pathlib import Path
+from textwrap import dedent
+from threading import Thread
+from time import time
+from typing import Any, ClassVar
+from urllib.parse import parse_qs, urlsplit
+
+import autodoc2.sphinx.extension
+import pytest
+import sphinx_tippy
+from autodoc2.analysis import analyse_module
+from dev.docs import (
+    PROFILE_REPORT,
+    analysis,
+    assets,
+    changelog,
+    docstrings,
+    incremental,
+    intersphinx,
+    live,
+    profiler,
+    tippy,
+)
+from dev.docs.types import IspxMappingValue
+from docutils.core import publish_doctree
+from myst_parser.docutils_ import Parser
+from numpydoc.docscrape import NumpyDocString, Parameter
+from sphinx.builders.html._assets import _CascadingStyleSheet
+from sphinx.cmd.build import build_main
+
+DOCSTRING = """Summary.
+
+Parameters
+----------
+a: int
+    First.
+b
+    Second.
+
+Output Files
+------------
+out.txt
+    Output.
+"""
+"""Docstring with a misplaced type annotation and an output files section."""
+
+
+@pytest.fixture
+def parsed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Project with empty docstring caches, returning docstrings as they are parsed."""
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "pyproject.toml").touch()
+    monkeypatch.chdir(tmp_path)
+    docstrings.load_cache.cache_clear()
+    docstrings.get_seen.cache_clear()
+    docstrings._convert.cache_clear()  # pyright: ignore[reportPrivateUsage]
+    parsed: list[str] = []
+
+    def parse(doc: str) -> NumpyDocString:
+        parsed.append(doc)
+        return NumpyDocString(doc)
+
+    monkeypatch.setattr(docstrings, "NumpyDocString", parse)
+    return parsed
+
+
+def test_convert_parses_once(parsed: list[str]):
+    """Docstrings are parsed once for both validation and rendering."""
+    doc = docstrings.replace_output_files_title(DOCSTRING, None)
+    conversion = docstrings.convert(doc)
+    assert docstrings.convert(doc) == conversion
+    assert parsed == [doc]
+    assert conversion.colon_names == ("a: int",)
+    assert "# Output Files\n\n- **out.txt**: Output." in conversion.markdown
+
+
+def test_convert_cached_on_disk(parsed: list[str]):
+    """Docstrings converted in previous builds are not parsed again."""
+    doc = docstrings.replace_output_files_title(DOCSTRING, None)
+    conversion = docstrings.convert(doc)
+    docstrings.save_cache(docstrings.CACHE.resolve())
+    docstrings.load_cache.cache_clear()
+    docstrings._convert.cache_clear()  # pyright: ignore[reportPrivateUsage]
+    assert docstrings.convert(doc) == conversion
+    assert parsed == [doc]
+
+
+def test_convert_cache_pruned(parsed: list[str]):
+    """Docstrings not seen during a build are dropped from the cache."""
+    docs = [f"Summary {i}." for i in range(2)]
+    docstrings.preconvert(docs, jobs=1)
+    docstrings.save_cache(path := docstrings.CACHE.resolve())
+    assert path.is_relative_to(Path(docstrings.DOCS_CACHE).resolve())
+    docstrings.load_cache.cache_clear()
+    docstrings.get_seen.cache_clear()
+    docstrings.preconvert(docs[:1], jobs=1)
+    docstrings.save_cache(path)
+    docstrings.load_cache.cache_clear()
+    assert list(docstrings.load_cache(path)) == [docstrings.get_key(docs[0])]
+
+
+def test_replace_output_files_title():
+    """Only the first "Output Files" section title is replaced, preserving the rest."""
+    doc = "Summary.\n\n  Output Files\n  ---\nout.txt\n\nOutput Files\n-\n"
+    assert docstrings.replace_output_files_title(doc, None) == (
+        "Summary.\n\n  Other Parameters\n  ----------------\nout.txt\n\nOutput Files\n-\n"
+    )
+
+
+def test_replace_output_files_title_rejects_other_parameters():
+    """The "Other Parameters" section is rejected wherever it is."""
+    with pytest.raises(ValueError, match="illegal section title"):
+        docstrings.replace_output_files_title(
+            "Summary.\n\nOther Parameters\n----------------\na\n    A.\n", "source"
+        )
+
+
+@pytest.mark.parametrize(
+    ("parameters", "plain"),
+    [
+        ("a: int\n    First.\nb\n    Second, or (third)?\n(int)\n    Fourth.", True),
+        ("a : int\n    See `b`.", False),
+        ("a : int\n    See example.com.", False),
+        ("a_b : int\n    First.", False),
+    ],
+)
+def test_parameter_nodes_match_myst(parameters: str, plain: bool):
+    """Parameter lists rendered as nodes match those rendered by MyST from Markdown."""
+    doc = f"Summary.\n\nParameters\n----------\n{parameters}\n\nNotes\n-----\nNote."
+    parameter_lists: list[tuple[Parameter, ...]] = []
+    markdown = docstrings.to_pure_markdown(doc, parameter_lists=parameter_lists)
+    assert bool(parameter_lists) == plain
+    document = publish_doctree(markdown, parser=Parser())
+    docstrings.replace_placeholders(document, parameter_lists)
+    expected = publish_doctree(docstrings.to_pure_markdown(doc), parser=Parser())
+    assert document.pformat() == expected.pformat()
+
+
+def test_get_docstrings(tmp_path: Path):
+    """Docstrings are found statically, including those of attributes."""
+    (package := tmp_path / "package").mkdir()
+    (package / "__init__.py").write_text(
+        encoding="utf-8",
+        data='"""Module."""\n\nA = 1\n"""Attribute."""\n\n\nclass B:\n'
+        '    """Class.\n\n    More.\n    """\n\n    def c(self):\n        """Method."""\n'
+        "        return (lambda: 1) if self else 2\n",
+    )
+    assert sorted(docstrings.get_docstrings([package])) == sorted([
+        "Module.",
+        "Attribute.",
+        "Class.\n\nMore.\n",
+        "Method.",
+    ])
+
+
+def test_get_docstrings_as_autodoc2_parses_them():
+    """Docstrings are found just as `autodoc2` passes them to the parser."""
+    package = Path(docstrings.__file__).parent
+    assert set(docstrings.get_docstrings([package])) == {
+        item["doc"]
+        for path in package.rglob("*.py")
+        for item in analyse_module(path, f"dev.docs.{path.stem}")
+        if item["doc"] and not item.get("inherited")
+    }
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_preconvert(parsed: list[str], jobs: int):
+    """Docstrings converted ahead of parsing are not parsed again."""
+    docs = [f"Summary {i}.\n\nParameters\n----------\na\n    A {i}." for i in range(4)]
+    assert docstrings.preconvert([*docs, docs[0]], jobs=jobs) == len(docs)
+    parsed.clear()
+    for doc in docs:
+        docstrings.convert(doc)
+    assert not parsed
+    assert docstrings.preconvert(docs, jobs=jobs) == 0
+
+
+def test_fingerprint_assets(tmp_path: Path):
+    """Static assets linked from pages are fingerprinted from a shared manifest."""
+    (static := tmp_path / "_static").mkdir()
+    (static / "local.css").write_text(encoding="utf-8", data="a {}")
+    manifest = assets.get_manifest(static)
+    digest = manifest["_static/local.css"]
+    css = _CascadingStyleSheet("_static/local.css", priority=10)
+    theme = _CascadingStyleSheet("_static/theme.css")
+    assert assets.fingerprint(["_static/local.css"], manifest) == [
+        f"_static/local.css?v={digest}"
+    ]
+    fingerprinted, untouched = assets.fingerprint([css, theme], manifest, True)
+    assert fingerprinted.filename == f"_static/local.{digest}.css"
+    assert (fingerprinted.priority, fingerprinted.attributes) == (10, css.attributes)
+    assert untouched is theme
+    assert assets.copy_fingerprinted(tmp_path, manifest) == [
+        static / f"local.{digest}.css"
+    ]
+
+
+def test_cache_inventories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Inventories are cached until stale, and offline builds only use the cache."""
+    warnings: list[str] = []
+    monkeypatch.setattr(intersphinx.LOGGER, "warning", warnings.append)
+    (remote := tmp_path / "remote").mkdir()
+    (remote / "objects.inv").write_bytes(b"first")
+    mapping = {"pkg": IspxMappingValue(remote.as_uri())}
+    cache = tmp_path / "cache"
+    with pytest.raises(FileNotFoundError, match="pkg"):
+        intersphinx.cache_inventories(mapping, cache, offline=True)
+    cached = intersphinx.cache_inventories(mapping, cache, offline=False)
+    assert cached == {
+        "pkg": IspxMappingValue(remote.as_uri(), f"{cache.as_posix()}/pkg.inv")
+    }
+    (remote / "objects.inv").write_bytes(b"second")
+    for kwds in [{"offline": False}, {"offline": True, "ttl": 0}]:
+        assert intersphinx.cache_inventories(mapping, cache, **kwds) == cached
+        assert (cache / "pkg.inv").read_bytes() == b"first"
+    intersphinx.cache_inventories(mapping, cache, ttl=0, offline=False)
+    assert (cache / "pkg.inv").read_bytes() == b"second"
+    assert not warnings
+    (remote / "objects.inv").unlink()
+    assert intersphinx.cache_inventories(mapping, cache, ttl=0, offline=False) == cached
+    assert len(warnings) == 1
+    assert "pkg" in warnings[0]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_profiler(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, jobs: int):
+    """Event handlers are timed in total and per document, as is reading."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    (docs := tmp_path / "docs").mkdir()
+    pages = [f"page{i}" for i in range(4)]
+    (docs / "index.md").write_text(
+        encoding="utf-8", data="\n".join(["# Index", "```{toctree}", *pages, "```"])
+    )
+    for page in pages:
+        (docs / f"{page}.md").write_text(encoding="utf-8", data=f"# {page}\n")
+    (docs / "conf.py").write_text(
+        encoding="utf-8",
+        data=dedent("""
+            from time import sleep
+
+            extensions = ["myst_parser", "dev.docs.profiler"]
+
+            def slow_read(app, docname, source):
+                sleep(0.01)
+
+            def setup(app):
+                app.connect("source-read", slow_read)
+            """),
+    )
+    build_main(["-qT", "-j", str(jobs), "-D", "profile_events=1", "docs", "_site"])
+    report = json.loads((tmp_path / PROFILE_REPORT).read_text("utf-8"))
+    (handler, timing), *_ = report["handlers"]["source-read"].items()
+    assert handler.endswith("slow_read")
+    assert timing["calls"] == 1 + len(pages)
+    assert timing["seconds"] >= 0.01 * (1 + len(pages))
+    for docname in ["index", *pages]:
+        timings = report["documents"][docname]
+        assert timings[profiler.READING] >= timings["source-read"] >= 0.01
+
+
+def test_analysis_cached(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Only modules that changed are analysed again, even in a new environment."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    (docs := tmp_path / "docs").mkdir()
+    (docs / "index.md").write_text(encoding="utf-8", data="# Index\n")
+    (docs / "conf.py").write_text(
+        encoding="utf-8",
+        data=dedent("""
+            extensions = ["myst_parser", "dev.docs.analysis"]
+            autodoc2_packages = ["../pkg"]
+            autodoc2_render_plugin = "myst"
+            """),
+    )
+    (package := tmp_path / "pkg").mkdir()
+    for name in ["__init__", "a", "b"]:
+        (package / f"{name}.py").write_text(encoding="utf-8", data=f'"""{name}."""\n')
+    analysed: list[str] = []
+    analyse = autodoc2.sphinx.extension.analyse_module
+
+    def analyse_module(file_path: Path, name: str, *args: Any) -> Any:
+        analysed.append(name)
+        return analyse(file_path, name, *args)
+
+    monkeypatch.setattr(autodoc2.sphinx.extension, "analyse_module", analyse_module)
+    build_main(["-qT", "docs", "_site"])
+    assert len(analysed) == 3
+    page = docs / "apidocs" / "pkg" / "pkg.a.md"
+    mtime = page.stat().st_mtime_ns
+    analysed.clear()
+    analysis.load_analyses.cache_clear()
+    (package / "b.py").write_text(encoding="utf-8", data="def f():\n    pass\n")
+    build_main(["-qET", "docs", "_site"])
+    assert analysed == ["pkg.b"]
+    assert page.stat().st_mtime_ns == mtime
+    assert "pkg.b.f" in (docs / "apidocs" / "pkg" / "pkg.b.md").read_text("utf-8")
+
+
+def test_incremental_by_content(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Documents are only read again if their contents or dependencies change."""
+    monkeypatch.chdir(tmp_path)
+    (docs := tmp_path / "docs").mkdir()
+    (docs / "conf.py").write_text(
+        encoding="utf-8", data='extensions = ["myst_parser", "dev.docs.incremental"]\n'
+    )
+    (index := docs / "index.md").write_text(
+        encoding="utf-8",
+        data="# Index\n\n```{include} ../README.md\n```\n\n```{toctree}\nother\n```\n",
+    )
+    (docs / "other.md").write_text(encoding="utf-8", data="# Other\n")
+    (readme := tmp_path / "README.md").write_text(encoding="utf-8", data="Readme.\n")
+    (doctrees := tmp_path / "doctrees").mkdir()
+
+    def build() -> set[str]:
+        """Build docs, returning documents read."""
+        mtimes = {p: p.stat().st_mtime_ns for p in doctrees.glob("*.doctree")}
+        build_main(["-qT", "-d", str(doctrees), "docs", "_site"])
+        return {
+            p.stem
+            for p in doctrees.glob("*.doctree")
+            if p.stat().st_mtime_ns != mtimes.get(p)
+        }
+
+    assert build() == {"index", "other"}
+    assert (doctrees / incremental.HASHES).exists()
+    later = time() + 60
+    for path in [*docs.glob("*.md"), readme]:
+        utime(path, (later, later))
+    assert not build()
+    readme.write_text(encoding="utf-8", data="Changed.\n")
+    assert build() == {"index"}
+    index.write_text(encoding="utf-8", data=f"{index.read_text('utf-8')}\nMore.\n")
+    assert build() == {"index"}
+
+
+def test_dependency_filter(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Only changes that affect pages are rebuilt."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    (docs := tmp_path / "docs").mkdir()
+    (docs / "index.md").write_text(
+        encoding="utf-8",
+        data="# Index\n\n```{include} ../README.md\n```\n\n```{toctree}\napidocs/index\n```\n",
+    )
+    (docs / "conf.py").write_text(
+        encoding="utf-8",
+        data=dedent("""
+            extensions = ["myst_parser", "autodoc2"]
+            autodoc2_packages = ["../pkg"]
+            autodoc2_render_plugin = "myst"
+            """),
+    )
+    (tmp_path / "README.md").write_text(encoding="utf-8", data="Readme.\n")
+    (package := tmp_path / "pkg").mkdir()
+    (package / "__init__.py").write_text(encoding="utf-8", data='"""Package."""\n')
+    (doctrees := tmp_path / "doctrees").mkdir()
+    build_main(["-qT", "-d", str(doctrees), "docs", "_site"])
+    ignore = live.DependencyFilter(docs, doctrees)
+    assert not any(
+        ignore(str(path))
+        for path in [
+            docs / "conf.py",
+            docs / "new.md",
+            tmp_path / "README.md",
+            package / "__init__.py",
+            package / "new.py",
+        ]
+    )
+    assert all(
+        ignore(str(path))
+        for path in [
+            docs / "apidocs" / "pkg" / "pkg.md",
+            docs / "data" / "results.csv",
+            docs / ".ipynb_checkpoints" / "new-checkpoint.ipynb",
+            package / "data.json",
+            tmp_path / "CHANGELOG.md",
+        ]
+    )
+
+
+def test_changelog_draft_cached(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Drafts are only rendered again when their sources change."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "docs").mkdir()
+    (pyproject := tmp_path / "pyproject.toml").write_text(
+        encoding="utf-8",
+        data=dedent("""
+            [tool.towncrier]
+            directory = "changelog"
+            template = "changelog/template.md.jinja"
+            """),
+    )
+    (fragments := tmp_path / "changelog").mkdir()
+    (template := fragments / "template.md.jinja").write_text(
+        encoding="utf-8", data="{{ sections }}\n"
+    )
+    rendered: list[str] = []
+
+    def render(target_version: str, *_args: Any, **_kwds: Any) -> str:
+        draft = (
+            "\n".join(p.read_text("utf-8") for p in sorted(fragments.glob("*.md")))
+            or changelog.EMPTY
+        )
+        rendered.append(draft)
+        return f"{target_version}\n{draft}"
+
+    get_changelog_draft_entries = changelog.get_cached_renderer(render)
+    with pytest.raises(LookupError):
+        get_changelog_draft_entries("draft", working_dir=str(tmp_path))
+    assert get_changelog_draft_entries("draft", allow_empty=True).endswith(
+        changelog.EMPTY
+    )
+    assert len(rendered) == 1
+    (fragments / "1.change.md").write_text(encoding="utf-8", data="Change.\n")
+    for _ in range(2):
+        assert get_changelog_draft_entries("draft") == "draft\nChange.\n"
+    assert len(rendered) == 2
+    for source, addition in [(template, "\n"), (pyproject, 'title_format = ""\n')]:
+        source.write_text(encoding="utf-8", data=source.read_text("utf-8") + addition)
+        get_changelog_draft_entries("draft")
+    assert len(rendered) == 4
+
+
+class FakeReadTheDocs(BaseHTTPRequestHandler):
+    """Stand-in ReadTheDocs embed API, failing for links to missing pages."""
+
+    urls: ClassVar[list[str]] = []
+    """Links that tips were requested for."""
+
+    def do_GET(self):  # noqa: D102, N802
+        (url,) = parse_qs(urlsplit(self.path).query)["url"]
+        self.urls.append(url)
+        status, data = (
+            (404, {}) if "missing" in url else (200, {"content": f"<p>{url}</p>"})
+        )
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any):  # noqa: A002, D102
+        pass
+
+
+@pytest.fixture
+def rtd(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[type[FakeReadTheDocs]]:
+    """Stand-in ReadTheDocs embed API, with tips fetched from it."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").touch()
+    (tmp_path / "docs").mkdir()
+    monkeypatch.setattr(FakeReadTheDocs, "urls", [])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeReadTheDocs)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v3/embed/"
+    monkeypatch.setattr(tippy, "RTD_API", url)
+    yield FakeReadTheDocs
+    server.shutdown()
+    server.server_close()
+
+
+def test_cache_tips(rtd: type[FakeReadTheDocs]):
+    """Tips are fetched once, and offline only from the cache."""
+    urls = [f"https://pkg.readthedocs.io/en/stable/{i}.html#a" for i in range(4)]
+    missing = "https://pkg.readthedocs.io/en/stable/missing.html"
+    tips = tippy.cache_tips([*urls[:3], missing], concurrency=2)
+    assert tips == {url: f"<p>{url}</p>" for url in urls[:3]}
+    assert sorted(rtd.urls) == sorted([*urls[:3], missing])
+    rtd.urls.clear()
+    assert tippy.cache_tips(urls, offline=True) == tips
+    assert not rtd.urls
+    assert tippy.cache_tips(urls)[urls[3]] == f"<p>{urls[3]}</p>"
+    assert rtd.urls == [urls[3]]
+
+
+def test_prefetch_tips(rtd: type[FakeReadTheDocs], monkeypatch: pytest.MonkeyPatch):
+    """Sphinx-tippy gets prefetched tips instead of fetching them itself."""
+    site = "https://pkg.readthedocs.io/en/stable"
+    (Path("docs") / "conf.py").write_text(
+        encoding="utf-8",
+        data=dedent(f"""
+            extensions = ["myst_parser", "dev.docs.tippy"]
+            tippy_enable_wikitips = False
+            tippy_enable_doitips = False
+            tippy_rtd_urls = ["{site}"]
+            """),
+    )
+    (Path("docs") / "index.md").write_text(
+        encoding="utf-8",
+        data=f"# Index\n\n[Found]({site}/found.html), [missing]({site}/missing.html)\n",
+    )
+    fetched: list[str] = []
+    monkeypatch.setattr(sphinx_tippy.requests, "get", fetched.append)
+    build_main(["-qT", "docs", "_site"])
+    assert not fetched
+    found = f"{site}/found.html"
+    assert sorted(rtd.urls) == [found, f"{site}/missing.html"]
+    tips = json.loads(Path("_site/tippy_rtd_cache.json").read_text("utf-8"))
+    assert tips == {found: f"<p>{found}</p>"}
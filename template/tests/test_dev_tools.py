@@ -0,0 +1,568 @@
+"""Tests for dev tools."""
+
+import json
+import os
+import re
+from collections.abc import Iterator
+from contextlib import chdir
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from inspect import getsource
+from pathlib import Path
+from subprocess import CalledProcessError, run
+from sys import executable
+from threading import Thread
+from typing import Any, ClassVar
+
+import nbformat
+import pytest
+from dev.tools import (
+    add_changes,
+    check,
+    configs,
+    daemon,
+    docs,
+    environment,
+    fragments,
+    github,
+    metadata,
+    notebooks,
+)
+from jupyter_cache import get_cache
+from nbformat.v4 import new_code_cell, new_notebook
+
+
+def fake_github(query: str) -> dict[str, Any]:
+    """Respond to a query, connecting PRs to even-numbered issues below 100."""
+    issues = {}
+    for alias, number in re.findall(r"(issue\d+): \w+\(number: (\d+)\)", query):
+        if int(number) >= 100:
+            issues[alias] = {"number": int(number), "title": f"PR {number}"}
+            continue
+        pr = int(number) + 100
+        nodes = [{"subject": {"number": pr, "title": f"PR {pr}"}}]
+        issues[alias] = {
+            "title": f"Issue {number}",
+            "timelineItems": {"nodes": [] if int(number) % 2 else nodes},
+        }
+    return {"data": {"repository": issues}}
+
+
+GH_STUB = f"""
+import json, re, sys
+from pathlib import Path
+from typing import Any
+
+{getsource(fake_github)}
+query = next(arg for arg in sys.argv if arg.startswith("query="))
+with Path(__file__).with_suffix(".log").open("a", encoding="utf-8") as log:
+    log.write(query + "\\n")
+print(json.dumps(fake_github(query)))
+"""
+"""Stub of the GitHub CLI, logging its queries."""
+
+
+@pytest.fixture
+def gh(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Stub the GitHub CLI, returning the log of its queries."""
+    monkeypatch.chdir(tmp_path)
+    stub = tmp_path / "gh.py"
+    stub.write_text(encoding="utf-8", data=GH_STUB)
+    monkeypatch.setattr(github, "GH", [executable, stub.as_posix()])
+    return stub.with_suffix(".log")
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    """Stand-in GitHub GraphQL server, rate-limiting requests while asked to."""
+
+    protocol_version = "HTTP/1.1"
+    limited = 0
+    """Number of requests left to rate-limit."""
+    clients: ClassVar[set[int]] = set()
+    """Ports of connected clients."""
+    queries: ClassVar[list[str]] = []
+    """Queries received."""
+
+    def do_POST(self):  # noqa: D102, N802
+        self.clients.add(self.client_address[1])
+        query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))[
+            "query"
+        ]
+        if FakeGitHub.limited:
+            FakeGitHub.limited -= 1
+            self.respond(429, {"message": "Rate limited."}, {"Retry-After": "0"})
+            return
+        self.queries.append(query)
+        self.respond(200, fake_github(query))
+
+    def respond(
+        self, status: int, data: dict[str, Any], headers: dict[str, str] | None = None
+    ):
+        """Respond with JSON."""
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        for k, v in {**(headers or {}), "Content-Length": str(len(body))}.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any):  # noqa: A002, D102
+        pass
+
+
+@pytest.fixture
+def http(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[type[FakeGitHub]]:
+    """Stand-in GitHub GraphQL server, with a transport pointed at it."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FakeGitHub, "limited", 0)
+    monkeypatch.setattr(FakeGitHub, "clients", set())
+    monkeypatch.setattr(FakeGitHub, "queries", [])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/graphql"
+    monkeypatch.setattr(github, "API", url)
+    yield FakeGitHub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Project with a `pyproject.toml`, and isolated environment variables."""
+    monkeypatch.setattr(os, "environ", os.environ.copy())
+    (tmp_path / "pyproject.toml").write_text(
+        encoding="utf-8", data='[tool.env]\nDEV_TEST = "1"\n'
+    )
+    return tmp_path
+
+
+def test_init_shell(project: Path):
+    """Shell initialization resolves `pyproject.toml:[tool.env]`."""
+    assert environment.init_shell(project) == "DEV_TEST=1"
+    assert os.environ["DEV_TEST"] == "1"
+
+
+def test_init_shell_cache_hit(project: Path):
+    """Shell initialization is served from cache if `[tool.env]` is unchanged."""
+    environment.init_shell(project)
+    cache = project / environment.ENV_CACHE
+    header, _, _ = cache.read_text("utf-8").partition("\n")
+    cache.write_text(encoding="utf-8", data=f"{header}\nDEV_TEST=cached")
+    assert environment.init_shell(project) == "DEV_TEST=cached"
+
+
+def test_init_shell_cache_invalidated(project: Path):
+    """Shell initialization cache is invalidated if `[tool.env]` changes."""
+    environment.init_shell(project)
+    (project / "pyproject.toml").write_text(
+        encoding="utf-8", data='[tool.env]\nDEV_TEST = "2"\n'
+    )
+    assert environment.init_shell(project) == "DEV_TEST=2"
+
+
+def test_daemon_execute(project: Path):
+    """Commands executed by the daemon respond as if invoked in another process."""
+    response = daemon.execute(["init-shell"], str(project), {"DEV_TEST_ENV": "1"})
+    assert response == daemon.Response(stdout="DEV_TEST=1\n", stderr="", code=0)
+    assert "DEV_TEST_ENV" not in os.environ
+
+
+def test_daemon_forward_without_daemon(project: Path):
+    """Commands run in-process if no daemon is running."""
+    assert daemon.forward(["init-shell"], project / daemon.SOCKET) is None
+
+
+def test_daemon_forward_without_unix_sockets(project: Path):
+    """Commands run in-process on platforms without Unix sockets, such as Windows."""
+    (project / daemon.SOCKET).parent.mkdir(parents=True, exist_ok=True)
+    (project / daemon.SOCKET).touch()
+    result = run(  # noqa: S603
+        [
+            executable,
+            "-c",
+            "; ".join([
+                "import socket",
+                "del socket.AF_UNIX",
+                "from dev.tools.__main__ import forward",
+                "print(forward(['init-shell']))",
+            ]),
+        ],
+        cwd=project,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "None"
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_run(capfd: pytest.CaptureFixture[str], in_process: bool):
+    """Modules run with their output."""
+    environment.run(["json.tool", "--help"], in_process=in_process)
+    assert "usage:" in capfd.readouterr().out
+
+
+@pytest.mark.parametrize("in_process", [False, True])
+def test_run_passes_args_through(tmp_path: Path, in_process: bool):
+    """Arguments are passed through as they are, with spaces and backslashes."""
+    (path := tmp_path / "a b\\c (1).py").write_text(encoding="utf-8", data="A = 1\n")
+    environment.run(["py_compile", str(path)], in_process=in_process)
+
+
+def test_run_in_process_matches_subprocess(capfd: pytest.CaptureFixture[str]):
+    """Modules run in-process report failures as they would in a subprocess."""
+    results: list[tuple[int, str]] = []
+    for in_process in [False, True]:
+        with pytest.raises(CalledProcessError) as exc_info:
+            environment.run("json.tool --bogus", in_process=in_process)
+        results.append((exc_info.value.returncode, capfd.readouterr().err))
+    assert results[0] == results[1]
+
+
+def python(code: str, *needs: str) -> check.Task:
+    """Check task running Python code."""
+    return check.Task([executable, "-c", code], needs=needs)
+
+
+def test_check_runs_dependencies_first(capfd: pytest.CaptureFixture[str]):
+    """Checks start after the checks they need, with prefixed output."""
+    tasks = {
+        "first": python("print('first')"),
+        "second": python("print('second')", "first"),
+        "third": python("import time; time.sleep(0.2)", "first"),
+    }
+    timings = check.run_tasks(tasks)
+    assert all(timing.code == 0 for timing in timings.values())
+    assert timings["second"].start >= timings["first"].end
+    assert check.get_critical_path(tasks, timings) == ["first", "third"]
+    assert "[second] second" in capfd.readouterr().out.splitlines()
+
+
+def test_check_cancels_on_failure():
+    """Checks are cancelled once any check fails."""
+    tasks = {
+        "fails": python("raise SystemExit(3)"),
+        "slow": python("import time; time.sleep(10)"),
+        "never": python("", "fails"),
+    }
+    timings = check.run_tasks(tasks)
+    assert timings["fails"].code == 3
+    assert timings["slow"].code is None
+    assert "never" not in timings
+
+
+def test_check_cancels_when_not_started(capfd: pytest.CaptureFixture[str]):
+    """Checks are cancelled once any check cannot start."""
+    tasks = {
+        "missing": check.Task(["definitely-not-a-tool"]),
+        "slow": python("import time; time.sleep(10)"),
+        "never": python("", "missing"),
+    }
+    timings = check.run_tasks(tasks)
+    assert timings["missing"].code == check.NOT_FOUND
+    assert timings["slow"].code is None
+    assert "never" not in timings
+    assert "[missing] FileNotFoundError" in capfd.readouterr().out
+
+
+def test_check_selects_needed_tasks():
+    """Selected checks include the checks they need."""
+    assert list(check.select(check.TASKS, ["pytest"])) == ["ruff", "pytest"]
+
+
+def test_metadata_parses_once(tmp_path: Path):
+    """Files are only parsed again if they change."""
+    path, index = tmp_path / "file.txt", tmp_path / "index.pkl"
+    parsed: list[str] = []
+
+    def parse(contents: str) -> str:
+        parsed.append(contents)
+        return contents.upper()
+
+    path.write_text(encoding="utf-8", data="a")
+    assert metadata.get(path, parse, index) == "A"
+    assert metadata.get(path, parse, index) == "A"
+    path.write_text(encoding="utf-8", data="b")
+    assert metadata.get(path, parse, index) == "B"
+    assert parsed == ["a", "b"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_metadata_workflow_actions(tmp_path: Path):
+    """Actions used by workflows are indexed."""
+    (workflows := tmp_path / "workflows").mkdir()
+    (workflows / "ci.yml").write_text(
+        encoding="utf-8",
+        data='steps:\n  - uses: "actions/checkout@v4"\n  - uses: owner/action@v1\n',
+    )
+    assert metadata.get_workflow_actions(workflows) == [
+        "actions/checkout",
+        "owner/action",
+    ]
+
+
+def test_write_if_changed(tmp_path: Path):
+    """Files are not written if their contents would not change."""
+    path = tmp_path / "config.ini"
+    assert configs.write_if_changed(path, "a")
+    mtime = path.stat().st_mtime_ns
+    assert not configs.write_if_changed(path, "a")
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_sync_shadow_configs(tmp_path: Path):
+    """Shadow configs are only regenerated if their tables change."""
+    pyproject = tmp_path / "pyproject.toml"
+    tables = '[tool.pytest.ini_options]\naddopts = "-n 4"\n[tool.pyright]\n'
+    fingerprints: dict[Path, str] = {}
+    with chdir(tmp_path):
+        pyproject.write_text(encoding="utf-8", data=tables)
+        assert configs.sync_shadow_configs(fingerprints) == [configs.PYTEST_INI]
+        pyproject.write_text(encoding="utf-8", data=f"{tables}[tool.other]\n")
+        assert configs.sync_shadow_configs(fingerprints) == []
+        pyproject.write_text(encoding="utf-8", data=tables.replace("4", "2"))
+        assert configs.sync_shadow_configs(fingerprints) == []
+        assert "-n 0" in configs.PYTEST_INI.read_text("utf-8")
+
+
+def test_resync_shadow_configs_skips_invalid(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+):
+    """Invalid or incomplete `pyproject.toml` is reported, without raising."""
+    pyproject = tmp_path / "pyproject.toml"
+    fingerprints: dict[Path, str] = {}
+    with chdir(tmp_path):
+        for data in ["[tool.pyright]\n", "[tool\n"]:
+            pyproject.write_text(encoding="utf-8", data=data)
+            assert configs.resync_shadow_configs(fingerprints) == []
+    out = capsys.readouterr().out
+    assert "Skipped invalid `pyproject.toml`: KeyError: 'pytest'" in out
+    assert "TOMLDecodeError" in out
+
+
+def test_get_change_single_query(gh: Path):
+    """Changes are resolved with a single query."""
+    assert add_changes.get_change("owner", "repo", 1) == add_changes.Change(
+        1, "Issue 1"
+    )
+    assert add_changes.get_change("owner", "repo", 2) == add_changes.Change(
+        102, "PR 102"
+    )
+    assert len(gh.read_text("utf-8").splitlines()) == 2
+
+
+def test_get_changes_batch(gh: Path):
+    """Changes for many issues are resolved in one query."""
+    assert add_changes.get_changes("owner", "repo", [1, 2, 3, 2]) == {
+        1: add_changes.Change(1, "Issue 1"),
+        2: add_changes.Change(102, "PR 102"),
+        3: add_changes.Change(3, "Issue 3"),
+    }
+    assert len(gh.read_text("utf-8").splitlines()) == 1
+
+
+def test_get_changes_cached(gh: Path):
+    """Cached changes are not queried again."""
+    add_changes.get_changes("owner", "repo", [1, 2])
+    assert add_changes.get_changes("owner", "repo", [2, 3]) == {
+        2: add_changes.Change(102, "PR 102"),
+        3: add_changes.Change(3, "Issue 3"),
+    }
+    assert gh.read_text("utf-8").splitlines()[-1].count("(number:") == 1
+    assert not list(add_changes.CHANGES_CACHE.parent.glob("*.tmp"))
+
+
+def test_get_changes_offline(gh: Path, monkeypatch: pytest.MonkeyPatch):
+    """Changes are served from cache when offline, even if expired."""
+    add_changes.get_change("owner", "repo", 1)
+    monkeypatch.setattr(add_changes, "CHANGES_TTL", 0)
+    assert add_changes.get_change("owner", "repo", 1, offline=True) == (
+        add_changes.Change(1, "Issue 1")
+    )
+    with pytest.raises(RuntimeError, match="not cached"):
+        add_changes.get_change("owner", "repo", 2, offline=True)
+    assert len(gh.read_text("utf-8").splitlines()) == 1
+
+
+def test_get_changes_invalidated(gh: Path):
+    """Cached changes are queried again if refreshed or cleared."""
+    add_changes.get_change("owner", "repo", 1)
+    add_changes.get_change("owner", "repo", 1, refresh=True)
+    add_changes.clear_changes_cache("owner", "repo", [1])
+    add_changes.get_change("owner", "repo", 1)
+    assert len(gh.read_text("utf-8").splitlines()) == 3
+
+
+def test_http_transport_reuses_connections(http: type[FakeGitHub]):
+    """Queries over HTTP reuse a kept-alive connection."""
+    transport = github.HttpTransport(github.API, token="token", connections=1)  # noqa: S106
+    for issue in [1, 2, 3]:
+        add_changes.get_change("owner", "repo", issue, transport=transport)
+    transport.close()
+    assert len(http.queries) == 3
+    assert len(http.clients) == 1
+
+
+def test_http_transport_batches_concurrently(
+    http: type[FakeGitHub], monkeypatch: pytest.MonkeyPatch
+):
+    """Batches of issues are queried concurrently over pooled connections."""
+    monkeypatch.setattr(add_changes, "ISSUES_PER_QUERY", 2)
+    transport = github.HttpTransport(github.API, token="token", connections=2)  # noqa: S106
+    assert add_changes.get_changes(
+        "owner", "repo", [1, 2, 3, 4, 5], transport=transport
+    ) == {
+        1: add_changes.Change(1, "Issue 1"),
+        2: add_changes.Change(102, "PR 102"),
+        3: add_changes.Change(3, "Issue 3"),
+        4: add_changes.Change(104, "PR 104"),
+        5: add_changes.Change(5, "Issue 5"),
+    }
+    transport.close()
+    assert len(http.queries) == 3
+    assert len(http.clients) <= 2
+
+
+def test_http_transport_retries_when_rate_limited(http: type[FakeGitHub]):
+    """Rate-limited queries are retried, up to a limit."""
+    transport = github.HttpTransport(github.API, token="token", retries=2)  # noqa: S106
+    http.limited = 2
+    assert add_changes.get_change("owner", "repo", 2, transport=transport) == (
+        add_changes.Change(102, "PR 102")
+    )
+    http.limited = 3
+    with pytest.raises(RuntimeError, match="Rate limited"):
+        add_changes.get_change("owner", "repo", 3, transport=transport)
+    transport.close()
+
+
+def git(*args: str):
+    """Run a Git command."""
+    run(  # noqa: S603
+        ["git", "-c", "user.name=dev", "-c", "user.email=dev@localhost", *args],  # noqa: S607
+        check=True,
+        capture_output=True,
+    )
+
+
+def test_add_changes_since_tag(gh: Path):
+    """Changes merged since a tag are added, skipping those with fragments."""
+    git("init")
+    git("remote", "add", "origin", "https://github.com/owner/repo.git")
+    for message in [
+        "Merge pull request #102 from owner/2-before",
+        "Tagged",
+        "Merge pull request #101 from owner/1-first",
+        "Unrelated",
+        "Merge branch '4-second'",
+        "Merge branch 'owner/5=third'",
+        "Merge branch '1-first'",
+    ]:
+        git("commit", "--allow-empty", "-m", message)
+        if message == "Tagged":
+            git("tag", "v1")
+    Path("pyproject.toml").write_text(
+        encoding="utf-8",
+        data='[tool.towncrier]\ndirectory = "changelog"\n'
+        + "".join(
+            f'[[tool.towncrier.type]]\ndirectory = "{kind}"\nname = "{kind}"\n'
+            for kind in ["breaking", "deprecation", "change"]
+        ),
+    )
+    (changelog := Path("changelog")).mkdir()
+    (changelog / "5.change.md").write_text(encoding="utf-8", data="Issue 5\n")
+    assert sorted(add_changes.add_changes("v1")) == [
+        "1.change.md",
+        "101.change.md",
+        "104.change.md",
+    ]
+    assert (changelog / "104.change.md").read_text("utf-8").strip() == "PR 104"
+    assert len(gh.read_text("utf-8").splitlines()) == 1
+
+
+def test_add_changes_since_missing_tag(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Adding changes since a missing tag fails clearly."""
+    monkeypatch.chdir(tmp_path)
+    git("init")
+    git("commit", "--allow-empty", "-m", "Initial")
+    with pytest.raises(RuntimeError, match="Tag 'v1' not found"):
+        list(add_changes.get_merged(add_changes.Repo("."), "v1"))
+
+
+def test_write_fragments(tmp_path: Path):
+    """Fragments are written in one batch, or not at all if any is a duplicate."""
+    towncrier = fragments.Towncrier(tmp_path / "changelog", ["change"])
+    first = fragments.Fragment("1", "change", "First")
+    assert fragments.write_fragments([first], towncrier) == [
+        towncrier.directory / "1.change.md"
+    ]
+    second = fragments.Fragment("2", "change", "Second")
+    for batch in [[second, first], [second, second]]:
+        with pytest.raises(FileExistsError):
+            fragments.write_fragments(batch, towncrier)
+    with pytest.raises(ValueError, match="Unknown fragment type"):
+        fragments.write_fragments([fragments.Fragment("2", "other", "")], towncrier)
+    assert fragments.get_index(towncrier) == {("1", "change")}
+    assert [path.name for path in towncrier.directory.iterdir()] == ["1.change.md"]
+
+
+def test_get_doctrees(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Doctrees are keyed by docs config, and stale ones pruned but not notebooks."""
+    monkeypatch.chdir(tmp_path)
+    (conf := tmp_path / "conf.py").write_text(encoding="utf-8", data="a = 1")
+    first = docs.get_doctrees([conf])
+    assert docs.get_doctrees([conf]) == first
+    first.mkdir(parents=True)
+    (tmp_path / docs.NOTEBOOK_CACHE).mkdir(parents=True)
+    conf.write_text(encoding="utf-8", data="a = 2")
+    second = docs.get_doctrees([conf])
+    assert second != first
+    assert not first.parent.exists()
+    assert (tmp_path / docs.NOTEBOOK_CACHE).exists()
+
+
+def test_profile_docs_args(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Docs are profiled with one argument per token."""
+    monkeypatch.chdir(tmp_path)
+    calls: list[list[str]] = []
+
+    def run(args: list[str]):
+        calls.append(args)
+        docs.PROFILE_REPORT.parent.mkdir(parents=True, exist_ok=True)
+        docs.PROFILE_REPORT.write_text(encoding="utf-8", data='{"handlers": {}}')
+
+    monkeypatch.setattr(docs, "run", run)
+    assert docs.profile_docs(view=False) == []
+    profile = (tmp_path / docs.PROFILE / "build.prof").resolve().as_posix()
+    assert calls == [
+        [
+            *["cProfile", "-o", profile, "-m", "sphinx", "-ET"],
+            *["-D", "profile_events=1", "-d", f"{docs.PROFILE.as_posix()}/doctrees"],
+            *[docs.DOCS.as_posix(), f"{docs.PROFILE.as_posix()}/_site"],
+        ]
+    ]
+
+
+@pytest.mark.slow
+def test_execute_notebooks(project: Path, monkeypatch: pytest.MonkeyPatch):
+    """Stale notebooks are executed concurrently into the cache, and only once."""
+    monkeypatch.chdir(project)
+    examples = project / "docs" / "examples"
+    examples.mkdir(parents=True)
+    for name, code in [("fast", "1"), ("slow", "import time; time.sleep(30)")]:
+        notebook = new_notebook(cells=[new_code_cell(code)])
+        notebook.metadata["kernelspec"] = {
+            "name": "python3",
+            "display_name": "Python 3",
+            "language": "python",
+        }
+        nbformat.write(notebook, examples / f"{name}.ipynb")
+    with pytest.raises(RuntimeError, match=r"slow\.ipynb: Timed out"):
+        notebooks.execute_notebooks(Path("docs/examples"), kernels=2, timeout=5)
+    cache = get_cache((project / notebooks.NOTEBOOK_CACHE).as_posix())
+    fast = cache.match_cache_file((examples / "fast.ipynb").as_posix())
+    assert fast.data["execution_seconds"] > 0
+    (examples / "slow.ipynb").unlink()
+    assert notebooks.execute_notebooks(Path("docs/examples")) == [
+        "Executed 0 of 1 notebooks, 1 already cached"
+    ]
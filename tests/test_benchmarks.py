@@ -0,0 +1,211 @@
+"""Benchmarks."""
+
+import re
+import socket
+from collections.abc import Callable
+from os import environ
+from pathlib import Path
+from shutil import which
+from statistics import median
+from subprocess import Popen, run
+from sys import executable
+from time import perf_counter, sleep
+
+import pytest
+from dev.docs import docstrings
+from dev.docs.docstrings import replace_output_files_title
+from dev.tools.daemon import SOCKET
+from dev.tools.environment import run_in_process, run_shell
+
+STARTUP_BUDGETS: dict[str, float] = {"--help": 0.5, "init-shell": 0.8}
+"""Budgets for cold import time of `dev` commands, in seconds."""
+STARTUP_EXCLUDES: dict[str, list[str]] = {
+    "--help": ["dulwich", "dotenv", "pydantic_settings", "tomllib"],
+    "init-shell": ["dulwich"],
+}
+"""Modules that must not be imported when starting `dev` commands."""
+DAEMON_INVOCATIONS = 5
+"""Number of invocations to time with and without a warm daemon."""
+RUN_INVOCATIONS = 5
+"""Number of invocations to time for each way of running modules."""
+DOCSTRING_SIZES = [2000, 4000, 8000]
+"""Sizes of synthetic docstrings to scan for sections."""
+OTHER_PARAMETERS = re.compile(".*Other Parameters *\n *--+ *\n")
+"""Former regular expression for the "Other Parameters" section, for comparison."""
+OUTPUT_SECTION_TITLE = re.compile(
+    "(?P<before>.*?)(?P<padding> *)Output Files\n *-+(?P<after>.*)",
+    re.MULTILINE | re.DOTALL,
+)
+"""Former regular expression for the "Output Files" section, for comparison."""
+
+
+def get_import_times(*args: str) -> dict[str, float]:
+    """Get cumulative import times in seconds from `python -X importtime`.
+
+    Nested imports are keyed by their indentation-prefixed names, so that top-level
+    imports sum to the total import time.
+    """
+    result = run(  # noqa: S603
+        [executable, "-X", "importtime", "-m", "dev.tools", *args],
+        capture_output=True,
+        check=True,
+        env={**environ, "PYTHONWARNINGS": "ignore"},
+        text=True,
+    )
+    times: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, package = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[package.removeprefix(" ").rstrip()] = int(cumulative) / 1e6
+    return times
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("command", STARTUP_BUDGETS)
+def test_startup_budget(command: str):
+    """Cold startup of `dev` commands stays within budget."""
+    times = get_import_times(command)
+    total = sum(time for module, time in times.items() if not module.startswith(" "))
+    assert total < STARTUP_BUDGETS[command]
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("command", STARTUP_EXCLUDES)
+def test_startup_excludes(command: str):
+    """Cold startup of `dev` commands does not import dependencies of others."""
+    times = get_import_times(command)
+    assert not [
+        module
+        for module in times
+        for exclude in STARTUP_EXCLUDES[command]
+        if module.strip().split(".")[0] == exclude
+    ]
+
+
+def time_invocations(cwd: Path, *args: str) -> list[float]:
+    """Time invocations of a `dev` command, in seconds."""
+    times: list[float] = []
+    for _ in range(DAEMON_INVOCATIONS):
+        start = perf_counter()
+        run(  # noqa: S603
+            [executable, "-m", "dev.tools", *args],
+            capture_output=True,
+            check=True,
+            cwd=cwd,
+        )
+        times.append(perf_counter() - start)
+    return times
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Requires Unix sockets.")
+def test_daemon_latency(tmp_path: Path):
+    """Commands served by a warm daemon are faster than cold invocations."""
+    (tmp_path / "pyproject.toml").write_text(
+        encoding="utf-8", data='[tool.env]\nDEV_TEST = "1"\n'
+    )
+    cold = time_invocations(tmp_path, "init-shell")
+    with Popen([executable, "-m", "dev.tools", "serve"], cwd=tmp_path) as server:  # noqa: S603
+        try:
+            while not (tmp_path / SOCKET).exists():
+                sleep(0.05)
+            warm = time_invocations(tmp_path, "init-shell")
+        finally:
+            server.terminate()
+    assert median(warm) < median(cold)
+
+
+@pytest.mark.slow
+def test_run_startup_saved(
+    record_property: Callable[[str, object], None], capfd: pytest.CaptureFixture[str]
+):
+    """Record how much faster modules start when run directly or in-process than in `pwsh`."""
+    runners: dict[str, Callable[[], object]] = {
+        "direct": lambda: run([executable, "-m", "platform"], check=True),  # noqa: S603
+        "in_process": lambda: run_in_process(["platform"]),
+    }
+    if which("pwsh"):
+        runners["shell"] = lambda: run_shell("platform")
+    times: dict[str, float] = {}
+    for runner, call in runners.items():
+        start = perf_counter()
+        for _ in range(RUN_INVOCATIONS):
+            call()
+        times[runner] = (perf_counter() - start) / RUN_INVOCATIONS
+    capfd.readouterr()
+    for runner, time in times.items():
+        record_property(f"{runner}_seconds_per_call", time)
+    if shell := times.get("shell"):
+        for runner in ["direct", "in_process"]:
+            record_property(f"{runner}_seconds_saved_per_call", shell - times[runner])
+    record_property(
+        "in_process_seconds_saved_over_direct", times["direct"] - times["in_process"]
+    )
+
+
+def get_synthetic_docstrings(size: int) -> dict[str, str]:
+    """Get large synthetic docstrings with no sections to replace."""
+    return {
+        "parameters": "\n".join([
+            "Summary.",
+            "",
+            "Parameters",
+            "----------",
+            *(f"p{i}\n    Parameter {i}." for i in range(size)),
+        ]),
+        "whitespace": "\n".join(["Summary.", " " * size, "Notes", "-----"]),
+    }
+
+
+def time_best(function: Callable[[], object], repeat: int = 3) -> float:
+    """Time the best of several calls, in seconds."""
+    times: list[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+@pytest.mark.slow
+def test_section_scanner_scaling(
+    record_property: Callable[[str, object], None], monkeypatch: pytest.MonkeyPatch
+):
+    """Scanning for sections checks each line at most once.
+
+    Timings against the regular expressions it replaced are recorded, not asserted.
+    """
+    checked: list[str] = []
+    is_underline = docstrings.is_underline
+
+    def count_is_underline(line: str) -> bool:
+        checked.append(line)
+        return is_underline(line)
+
+    monkeypatch.setattr(docstrings, "is_underline", count_is_underline)
+    times: dict[tuple[str, str, int], float] = {}
+    for size in DOCSTRING_SIZES:
+        for kind, doc in get_synthetic_docstrings(size).items():
+            times["regex", kind, size] = time_best(
+                lambda doc=doc: (
+                    OTHER_PARAMETERS.match(doc),
+                    OUTPUT_SECTION_TITLE.match(doc),
+                )
+            )
+            times["scanner", kind, size] = time_best(
+                lambda doc=doc: replace_output_files_title(doc, None)
+            )
+            checked.clear()
+            replace_output_files_title(doc, None)
+            # ? Each line is checked at most once, so work grows with the docstring
+            assert len(checked) < len(doc.splitlines())
+            assert sum(map(len, checked)) <= len(doc)
+    for (method, kind, size), time in times.items():
+        record_property(f"{method}_{kind}_{size}_seconds", time)
+    smallest, largest = DOCSTRING_SIZES[0], DOCSTRING_SIZES[-1]
+    record_property(
+        "regex_whitespace_growth",
+        times["regex", "whitespace", largest] / times["regex", "whitespace", smallest],
+    )